@@ -0,0 +1,94 @@
+"""Micro-benchmark: buffered versus incremental Atom parsing.
+
+Both sides use the public parser API that ingestion and ``arxiv_search``
+call (:class:`AtomFeedParser` and :func:`iter_entries`), so only the
+buffering strategy differs.
+
+Usage::
+
+    uv run python -m rag_api.benchmarks.atom_parsing --entries 1000 --entries 20000
+"""
+
+from __future__ import annotations
+
+import time
+import tracemalloc
+from typing import Callable, Iterable
+
+import typer
+from rich.console import Console
+from rich.table import Table
+
+from rag_api.benchmarks.fixtures import build_feed
+from rag_api.clients.arxiv import STREAM_CHUNK_SIZE, AtomFeedParser, iter_entries
+
+app = typer.Typer(help="Compare Atom feed parsing strategies.")
+console = Console()
+
+
+def _chunks(payload: bytes) -> Iterable[bytes]:
+    for offset in range(0, len(payload), STREAM_CHUNK_SIZE):
+        yield payload[offset : offset + STREAM_CHUNK_SIZE]
+
+
+def parse_buffered(chunks: Iterable[bytes]) -> int:
+    """The previous approach: buffer the whole body, then parse it and collect every entry."""
+
+    parser = AtomFeedParser()
+    entries = parser.feed(b"".join(chunks)) + parser.close()
+    return len(entries)
+
+
+def parse_streaming(chunks: Iterable[bytes]) -> int:
+    """The shared incremental parser in :mod:`rag_api.clients.arxiv`."""
+
+    return sum(1 for _ in iter_entries(chunks))
+
+
+def _measure(parse: Callable[[Iterable[bytes]], int], payload: bytes, repeat: int) -> tuple[float, int]:
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        parse(_chunks(payload))
+        best = min(best, time.perf_counter() - started)
+
+    tracemalloc.start()
+    parse(_chunks(payload))
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best, peak
+
+
+@app.command()
+def run(
+    entries: list[int] = typer.Option([100, 2000, 20000], help="Feed sizes to benchmark"),
+    repeat: int = typer.Option(3, min=1, help="Timing repetitions (best is reported)"),
+) -> None:
+    """Benchmark both parsers on synthetic feeds of increasing size."""
+
+    table = Table(title="Atom feed parsing")
+    table.add_column("Entries", justify="right")
+    table.add_column("Feed MiB", justify="right")
+    table.add_column("Parser")
+    table.add_column("Best ms", justify="right")
+    table.add_column("Entries/sec", justify="right")
+    table.add_column("Peak MiB", justify="right")
+
+    for size in entries:
+        payload = build_feed(0, size, size)
+        for name, parse in (("buffered", parse_buffered), ("streaming", parse_streaming)):
+            seconds, peak = _measure(parse, payload, repeat)
+            table.add_row(
+                str(size),
+                f"{len(payload) / 2**20:.1f}",
+                name,
+                f"{seconds * 1000:.1f}",
+                f"{size / seconds:,.0f}",
+                f"{peak / 2**20:.1f}",
+            )
+
+    console.print(table)
+
+
+if __name__ == "__main__":
+    app()
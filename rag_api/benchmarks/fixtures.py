@@ -0,0 +1,64 @@
+"""Synthetic arXiv data shared by the benchmarks.
+
+Everything here is deterministic in the paper index, so repeated runs and
+different benchmarks see the same corpus.
+"""
+
+from __future__ import annotations
+
+import random
+
+_WORDS = (
+    "retrieval augmented generation transformer attention sparse dense vector index "
+    "quantum circuit error correction qubit graph neural network diffusion model "
+    "benchmark dataset evaluation latency throughput memory scaling training inference "
+    "language corpus embedding contrastive objective gradient optimisation convergence"
+).split()
+
+_ENTRY_TEMPLATE = """
+  <entry>
+    <id>http://arxiv.org/abs/2401.{index:05d}v1</id>
+    <updated>{published}</updated>
+    <published>{published}</published>
+    <title>Synthetic paper {index} on
+      scalable retrieval</title>
+    <summary>{summary}</summary>
+    <author><name>Author {index}</name></author>
+    <author><name>Second Author</name></author>
+    <arxiv:primary_category term="cs.IR" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.IR" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <link href="http://arxiv.org/abs/2401.{index:05d}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/2401.{index:05d}v1" rel="related" type="application/pdf"/>
+  </entry>"""
+
+
+def synthetic_abstract(index: int, sentences: int = 12) -> str:
+    """Deterministic abstract-like text for paper ``index``."""
+
+    rng = random.Random(index)
+    return " ".join(
+        " ".join(rng.choice(_WORDS) for _ in range(rng.randint(10, 25))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def build_feed(start: int, count: int, total: int) -> bytes:
+    """Return one page of a synthetic Atom feed over a corpus of ``total`` papers."""
+
+    entries = "".join(
+        _ENTRY_TEMPLATE.format(
+            index=index,
+            published=f"2024-01-{1 + index % 28:02d}T00:00:00Z",
+            summary=synthetic_abstract(index),
+        )
+        for index in range(start, min(start + count, total))
+    )
+    return (
+        '<?xml version="1.0" encoding="UTF-8"?>\n'
+        '<feed xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:arxiv="http://arxiv.org/schemas/atom" '
+        'xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">'
+        f"<opensearch:totalResults>{total}</opensearch:totalResults>"
+        f"{entries}</feed>"
+    ).encode("utf-8")
@@ -0,0 +1,279 @@
+"""Offline ingestion throughput benchmark.
+
+Runs the ingestion stages, one at a time and then end to end through the
+staged pipeline, against a local fixture arXiv API server, a
+deterministic fake embedding model and Qdrant's in-process local mode, so no
+network, API key or Qdrant server is needed. Reports per-stage latency and
+throughput for each corpus size and writes the results as JSON; pass a
+previous results file as ``--baseline`` to fail on regressions.
+
+Usage::
+
+    uv run python -m rag_api.benchmarks.ingestion --size 200 --size 2000 --output bench.json
+    uv run python -m rag_api.benchmarks.ingestion --baseline bench.json
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import platform
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Iterator
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+import typer
+from langchain_core.embeddings import Embeddings
+from rich.console import Console
+from rich.table import Table
+
+from rag_api.benchmarks.fixtures import build_feed
+
+app = typer.Typer(help="Benchmark ingestion stages offline.")
+console = Console()
+
+
+@contextmanager
+def fixture_feed_server(total: int) -> Iterator[str]:
+    """Serve a paged synthetic arXiv API on localhost and yield its URL."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self) -> None:  # noqa: N802
+            params = parse_qs(urlparse(self.path).query)
+            start = int(params.get("start", ["0"])[0])
+            count = int(params.get("max_results", ["10"])[0])
+            body = build_feed(start, count, total)
+            self.send_response(200)
+            self.send_header("Content-Type", "application/atom+xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args: Any) -> None:
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        yield f"http://127.0.0.1:{server.server_address[1]}/api/query"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic hash-based embeddings with optional simulated API latency."""
+
+    def __init__(self, dimension: int = 384, latency: float = 0.0) -> None:
+        self.dimension = dimension
+        self.latency = latency
+
+    def _vector(self, text: str) -> list[float]:
+        digest = hashlib.shake_128(text.encode("utf-8")).digest(self.dimension * 2)
+        vector = np.frombuffer(digest, dtype=np.uint16).astype(np.float32) - 32768.0
+        return (vector / np.linalg.norm(vector)).tolist()
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        if self.latency:
+            time.sleep(self.latency)
+        return [self._vector(text) for text in texts]
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+@dataclass
+class StageResult:
+    size: int
+    stage: str
+    items: int
+    seconds: float
+
+    @property
+    def per_sec(self) -> float:
+        return self.items / self.seconds if self.seconds > 0 else 0.0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            **asdict(self),
+            "seconds": round(self.seconds, 4),
+            "per_sec": round(self.per_sec, 2),
+            "ms_per_item": round(self.seconds * 1000 / self.items, 4) if self.items else 0.0,
+        }
+
+
+def _timed(fn: Callable[[], Any]) -> tuple[Any, float]:
+    started = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - started
+
+
+def _configure(api_url: str, batch_size: int) -> None:
+    # Point every client at the offline fixtures before anything reads settings.
+    os.environ.update(
+        {
+            "ARXIV_API_URL": api_url,
+            "ARXIV_REQUEST_INTERVAL": "0",
+            "QDRANT_URL": ":memory:",
+            "QDRANT_COLLECTION": "ingestion_benchmark",
+            "EMBEDDING_CACHE_ENABLED": "false",
+            "INGESTION_BATCH_SIZE": str(batch_size),
+            "NEAR_DEDUP_ENABLED": "false",
+        }
+    )
+    from rag_api.clients.qdrant import get_collection_profile, get_qdrant_client
+    from rag_api.clients.ratelimit import get_arxiv_rate_limiter
+    from rag_api.ingestion.dedup import get_near_duplicate_index
+    from rag_api.settings import get_settings
+
+    get_settings.cache_clear()
+    get_qdrant_client.cache_clear()
+    get_collection_profile.cache_clear()
+    get_arxiv_rate_limiter.cache_clear()
+    get_near_duplicate_index.cache_clear()
+
+
+def run_benchmark(
+    sizes: list[int], dimension: int, embed_latency: float, batch_size: int
+) -> list[StageResult]:
+    """Run every stage for each corpus size and return the measurements."""
+
+    from rag_api.clients.qdrant import get_collection_profile, get_qdrant_client
+    from rag_api.ingestion.arxiv import load_documents
+    from rag_api.ingestion.chunking import chunk_documents
+    from rag_api.ingestion.pipeline import store_documents
+    from rag_api.ingestion.store import upsert_documents
+    from rag_api.settings import get_settings
+
+    results: list[StageResult] = []
+    with fixture_feed_server(max(sizes)) as api_url:
+        _configure(api_url, batch_size)
+        settings = get_settings()
+        client = get_qdrant_client()
+        embeddings = FakeEmbeddings(dimension, latency=embed_latency)
+
+        def recreate() -> None:
+            if client.collection_exists(settings.qdrant_collection):
+                client.delete_collection(settings.qdrant_collection)
+            client.create_collection(
+                collection_name=settings.qdrant_collection,
+                **get_collection_profile().create_kwargs(dimension),
+            )
+
+        for size in sizes:
+            documents, seconds = _timed(lambda: load_documents("benchmark", size))
+            results.append(StageResult(size, "load_documents", len(documents), seconds))
+
+            chunks, seconds = _timed(lambda: list(chunk_documents(documents)))
+            results.append(StageResult(size, "chunking", len(chunks), seconds))
+
+            texts = [chunk.page_content for chunk in chunks]
+            _, seconds = _timed(
+                lambda: [
+                    embeddings.embed_documents(texts[offset : offset + batch_size])
+                    for offset in range(0, len(texts), batch_size)
+                ]
+            )
+            results.append(StageResult(size, "embedding", len(texts), seconds))
+
+            # Upsert into a fresh collection with a zero-latency model, so
+            # this stage measures hashing, existence checks and writes.
+            recreate()
+            written, seconds = _timed(
+                lambda: upsert_documents(chunks, embeddings=FakeEmbeddings(dimension))
+            )
+            results.append(StageResult(size, "upsert_documents", written, seconds))
+
+            # End to end through the staged pipeline, where chunking,
+            # embedding (with the simulated latency) and writes overlap.
+            recreate()
+            written, seconds = _timed(
+                lambda: store_documents(documents, embeddings=embeddings)
+            )
+            results.append(StageResult(size, "staged_pipeline", written, seconds))
+
+    return results
+
+
+def compare(results: list[dict[str, Any]], baseline: list[dict[str, Any]], tolerance: float) -> list[str]:
+    """Return a message for every stage whose throughput fell more than ``tolerance``."""
+
+    previous = {(entry["size"], entry["stage"]): entry for entry in baseline}
+    regressions = []
+    for entry in results:
+        before = previous.get((entry["size"], entry["stage"]))
+        if not before or not before["per_sec"]:
+            continue
+        change = entry["per_sec"] / before["per_sec"] - 1
+        if change < -tolerance:
+            regressions.append(
+                f"{entry['stage']} @ {entry['size']}: {before['per_sec']:,.1f} -> "
+                f"{entry['per_sec']:,.1f} items/sec ({change:+.0%})"
+            )
+    return regressions
+
+
+@app.command()
+def run(
+    size: list[int] = typer.Option([200, 2000], help="Corpus sizes (papers) to benchmark"),
+    dimension: int = typer.Option(384, help="Fake embedding dimension"),
+    embed_latency: float = typer.Option(0.0, help="Simulated seconds per embedding request"),
+    batch_size: int = typer.Option(64, help="Documents per embedding request / upsert"),
+    output: Path | None = typer.Option(None, help="Write results JSON here"),
+    baseline: Path | None = typer.Option(None, exists=True, help="Previous results JSON to compare"),
+    tolerance: float = typer.Option(0.2, help="Allowed throughput drop versus the baseline"),
+) -> None:
+    """Benchmark load, chunk, embed and upsert stages offline."""
+
+    results = [result.to_dict() for result in run_benchmark(sorted(set(size)), dimension, embed_latency, batch_size)]
+
+    table = Table(title="Ingestion stages")
+    table.add_column("Papers", justify="right")
+    table.add_column("Stage")
+    table.add_column("Items", justify="right")
+    table.add_column("Seconds", justify="right")
+    table.add_column("Items/sec", justify="right")
+    table.add_column("ms/item", justify="right")
+    for entry in results:
+        table.add_row(
+            str(entry["size"]),
+            entry["stage"],
+            str(entry["items"]),
+            f"{entry['seconds']:.3f}",
+            f"{entry['per_sec']:,.0f}",
+            f"{entry['ms_per_item']:.3f}",
+        )
+    console.print(table)
+
+    if output:
+        payload = {
+            "benchmark": "ingestion",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {"dimension": dimension, "embed_latency": embed_latency, "batch_size": batch_size},
+            "results": results,
+        }
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        console.print(f"Results written to {output}")
+
+    if baseline:
+        regressions = compare(results, json.loads(baseline.read_text(encoding="utf-8"))["results"], tolerance)
+        for message in regressions:
+            console.print(f"[red]Regression[/red] {message}")
+        if regressions:
+            raise typer.Exit(code=1)
+        console.print(f"No regressions beyond {tolerance:.0%} against {baseline}")
+
+
+if __name__ == "__main__":
+    app()
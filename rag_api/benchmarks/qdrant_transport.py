@@ -0,0 +1,221 @@
+"""REST versus gRPC benchmark for the Qdrant client.
+
+Upserts synthetic chunk-sized points into a scratch collection and runs
+``rag_query``-shaped searches (top 10 with payloads) over each transport
+against a running Qdrant, such as the ``qdrant`` service of
+``docker-compose.yml`` (REST on 6334, gRPC on 6335). Reports upsert
+throughput and search latency percentiles per transport and writes the
+results as JSON. The scratch collections are deleted afterwards.
+
+Usage::
+
+    docker compose up -d qdrant
+    uv run python -m rag_api.benchmarks.qdrant_transport --points 5000 --output transport.json
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import platform
+import time
+from dataclasses import asdict, dataclass
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any
+
+import numpy as np
+import typer
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from rich.console import Console
+from rich.table import Table
+
+from rag_api.benchmarks.fixtures import synthetic_abstract
+from rag_api.clients.qdrant import qdrant_client_options
+from rag_api.settings import get_settings
+
+app = typer.Typer(help="Benchmark Qdrant REST against gRPC.")
+console = Console()
+
+TRANSPORTS = ("rest", "grpc")
+
+
+@dataclass
+class TransportResult:
+    transport: str
+    points: int
+    upsert_seconds: float
+    queries: int
+    search_p50_ms: float
+    search_p95_ms: float
+    search_seconds: float
+
+    @property
+    def upsert_per_sec(self) -> float:
+        return self.points / self.upsert_seconds if self.upsert_seconds > 0 else float("inf")
+
+    @property
+    def search_per_sec(self) -> float:
+        return self.queries / self.search_seconds if self.search_seconds > 0 else float("inf")
+
+    def to_dict(self) -> dict[str, Any]:
+        data = asdict(self)
+        data["upsert_per_sec"] = round(self.upsert_per_sec, 2)
+        data["search_per_sec"] = round(self.search_per_sec, 2)
+        return data
+
+
+def _vectors(count: int, dimension: int, seed: int) -> np.ndarray:
+    vectors = np.random.default_rng(seed).standard_normal((count, dimension), dtype=np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def _points(start: int, vectors: np.ndarray) -> list[models.PointStruct]:
+    return [
+        models.PointStruct(
+            id=start + offset,
+            vector=vector.tolist(),
+            payload={
+                "text": synthetic_abstract(start + offset),
+                "metadata": {
+                    "paper_id": f"2401.{start + offset:05d}",
+                    "title": f"Synthetic paper {start + offset}",
+                    "categories": ["cs.IR"],
+                    "published": "2024-01-01T00:00:00Z",
+                },
+            },
+        )
+        for offset, vector in enumerate(vectors)
+    ]
+
+
+def run_transport(
+    transport: str,
+    url: str,
+    grpc_port: int,
+    points: int,
+    dimension: int,
+    batch_size: int,
+    queries: int,
+) -> TransportResult:
+    """Upsert ``points`` points and run ``queries`` searches over one transport.
+
+    The client is configured like the application's (timeout, pooling, gRPC
+    keep-alive), with only the server and transport overridden.
+    """
+
+    options = {**qdrant_client_options(), "location": url, "grpc_port": grpc_port}
+    options["prefer_grpc"] = transport == "grpc"
+    client = QdrantClient(**options)
+    collection = f"bench_transport_{transport}_{os.getpid()}"
+    client.create_collection(
+        collection_name=collection,
+        vectors_config=models.VectorParams(size=dimension, distance=models.Distance.COSINE),
+    )
+    try:
+        corpus = _vectors(points, dimension, seed=0)
+        # Build the payloads up front so only serialisation and transport are timed.
+        batches = [
+            _points(start, corpus[start : start + batch_size]) for start in range(0, points, batch_size)
+        ]
+        started = time.perf_counter()
+        for batch in batches:
+            client.upsert(collection_name=collection, points=batch, wait=True)
+        upsert_seconds = time.perf_counter() - started
+
+        latencies: list[float] = []
+        for query_vector in _vectors(queries, dimension, seed=1).tolist():
+            started = time.perf_counter()
+            client.query_points(collection_name=collection, query=query_vector, limit=10, with_payload=True)
+            latencies.append(time.perf_counter() - started)
+    finally:
+        client.delete_collection(collection)
+        client.close()
+
+    return TransportResult(
+        transport=transport,
+        points=points,
+        upsert_seconds=round(upsert_seconds, 4),
+        queries=queries,
+        search_p50_ms=round(float(np.percentile(latencies, 50)) * 1000, 3),
+        search_p95_ms=round(float(np.percentile(latencies, 95)) * 1000, 3),
+        search_seconds=round(sum(latencies), 4),
+    )
+
+
+@app.command()
+def run(
+    url: str | None = typer.Option(None, help="Qdrant REST URL (default: QDRANT_URL)"),
+    grpc_port: int | None = typer.Option(None, help="Qdrant gRPC port (default: QDRANT_GRPC_PORT)"),
+    points: int = typer.Option(2000, help="Points upserted per transport"),
+    dimension: int = typer.Option(1536, help="Vector dimension"),
+    batch_size: int = typer.Option(64, help="Points per upsert request"),
+    queries: int = typer.Option(200, help="Searches per transport"),
+    transport: list[str] = typer.Option(list(TRANSPORTS), help="Transports to benchmark"),
+    output: Path | None = typer.Option(None, help="Write results JSON here"),
+) -> None:
+    """Compare upsert and search cost over REST and gRPC."""
+
+    settings = get_settings()
+    url = url or settings.qdrant_url
+    grpc_port = grpc_port or settings.qdrant_grpc_port
+    if not url.startswith(("http://", "https://")):
+        console.print(f"[red]Needs a Qdrant server URL, got {url!r}[/red]")
+        raise typer.Exit(code=2)
+    unknown = sorted(set(transport) - set(TRANSPORTS))
+    if unknown:
+        raise typer.BadParameter(f"Unknown transport(s): {', '.join(unknown)}")
+
+    results = [
+        run_transport(name, url, grpc_port, points, dimension, batch_size, queries)
+        for name in TRANSPORTS
+        if name in transport
+    ]
+
+    table = Table(title=f"Qdrant transports ({url}, gRPC port {grpc_port})")
+    table.add_column("Transport")
+    table.add_column("Points", justify="right")
+    table.add_column("Upserts/sec", justify="right")
+    table.add_column("Searches/sec", justify="right")
+    table.add_column("Search p50 ms", justify="right")
+    table.add_column("Search p95 ms", justify="right")
+    for result in results:
+        table.add_row(
+            result.transport,
+            str(result.points),
+            f"{result.upsert_per_sec:,.0f}",
+            f"{result.search_per_sec:,.0f}",
+            f"{result.search_p50_ms:.2f}",
+            f"{result.search_p95_ms:.2f}",
+        )
+    console.print(table)
+
+    by_name = {result.transport: result for result in results}
+    if {"rest", "grpc"} <= by_name.keys():
+        rest, grpc = by_name["rest"], by_name["grpc"]
+        console.print(
+            f"gRPC vs REST: upsert {grpc.upsert_per_sec / rest.upsert_per_sec:.2f}x, "
+            f"search p50 {rest.search_p50_ms / grpc.search_p50_ms:.2f}x faster"
+        )
+
+    if output:
+        payload = {
+            "benchmark": "qdrant_transport",
+            "created_at": datetime.now(timezone.utc).isoformat(),
+            "python": platform.python_version(),
+            "config": {
+                "url": url,
+                "grpc_port": grpc_port,
+                "dimension": dimension,
+                "batch_size": batch_size,
+            },
+            "results": [result.to_dict() for result in results],
+        }
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(payload, indent=2), encoding="utf-8")
+        console.print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    app()
@@ -0,0 +1,177 @@
+"""Incremental parser for arXiv Atom feeds.
+
+Shared by ingestion and the ``arxiv_search`` agent tool. The feed is parsed
+from the response stream with a pull parser and every ``<entry>`` element is
+discarded as soon as it has been turned into an :class:`ArxivEntry`, so memory
+use is bounded by a single entry rather than the whole response body.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass
+from typing import Iterable, Iterator
+from xml.etree import ElementTree as ET
+
+ATOM_NS = "{http://www.w3.org/2005/Atom}"
+ARXIV_NS = "{http://arxiv.org/schemas/atom}"
+OPENSEARCH_NS = "{http://a9.com/-/spec/opensearch/1.1/}"
+
+STREAM_CHUNK_SIZE = 64 * 1024
+
+_VERSIONED_ID = re.compile(r"^(?P<paper_id>.+?)(?:v(?P<version>\d+))?$")
+# 2401.01234v2 (since 2007) and hep-th/9901001v1 / math.GT/0309136 (before).
+_ARXIV_ID = re.compile(r"^(?:\d{4}\.\d{4,5}|[a-z]+(?:-[a-z]+)*(?:\.[A-Z]{2})?/\d{7})(?:v\d+)?$")
+
+
+def is_arxiv_id(value: str) -> bool:
+    """Whether ``value`` is a new- or old-style arXiv identifier, optionally versioned."""
+
+    return _ARXIV_ID.match(value.strip()) is not None
+
+
+def split_arxiv_id(arxiv_id: str) -> tuple[str, int | None]:
+    """Split ``2401.01234v2`` into ``("2401.01234", 2)``; version is None when absent."""
+
+    match = _VERSIONED_ID.match(arxiv_id.strip())
+    if match is None:
+        return arxiv_id, None
+    version = match.group("version")
+    return match.group("paper_id"), int(version) if version else None
+
+
+def compact_text(text: str | None) -> str:
+    """Collapse runs of whitespace (feed titles and abstracts are hard-wrapped)."""
+
+    return " ".join(text.split()) if text else ""
+
+
+@dataclass(frozen=True, slots=True)
+class ArxivEntry:
+    """Compact record of a single Atom ``<entry>``."""
+
+    arxiv_id: str
+    title: str
+    summary: str
+    authors: tuple[str, ...] = ()
+    categories: tuple[str, ...] = ()
+    primary_category: str | None = None
+    published: str | None = None
+    updated: str | None = None
+    pdf_url: str | None = None
+
+    @property
+    def paper_id(self) -> str:
+        return split_arxiv_id(self.arxiv_id)[0]
+
+    @property
+    def version(self) -> int | None:
+        return split_arxiv_id(self.arxiv_id)[1]
+
+    @property
+    def abs_url(self) -> str:
+        return f"https://arxiv.org/abs/{self.arxiv_id}"
+
+
+_ID = f"{ATOM_NS}id"
+_TITLE = f"{ATOM_NS}title"
+_SUMMARY = f"{ATOM_NS}summary"
+_AUTHOR = f"{ATOM_NS}author"
+_NAME = f"{ATOM_NS}name"
+_CATEGORY = f"{ATOM_NS}category"
+_LINK = f"{ATOM_NS}link"
+_PUBLISHED = f"{ATOM_NS}published"
+_UPDATED = f"{ATOM_NS}updated"
+_PRIMARY_CATEGORY = f"{ARXIV_NS}primary_category"
+_ENTRY = f"{ATOM_NS}entry"
+_TOTAL_RESULTS = f"{OPENSEARCH_NS}totalResults"
+
+
+def _entry_from_element(element: ET.Element) -> ArxivEntry:
+    """Build an :class:`ArxivEntry` in a single pass over the entry's children."""
+
+    fields: dict[str, str | None] = {}
+    authors: list[str] = []
+    categories: list[str] = []
+
+    for child in element:
+        tag = child.tag
+        if tag == _AUTHOR:
+            name = child.findtext(_NAME)
+            if name:
+                authors.append(compact_text(name))
+        elif tag == _CATEGORY:
+            term = child.get("term")
+            if term:
+                categories.append(term)
+        elif tag == _LINK:
+            if "pdf_url" not in fields and (
+                child.get("title") == "pdf" or child.get("type") == "application/pdf"
+            ):
+                fields["pdf_url"] = child.get("href")
+        elif tag == _PRIMARY_CATEGORY:
+            fields["primary_category"] = child.get("term")
+        elif tag in (_ID, _TITLE, _SUMMARY, _PUBLISHED, _UPDATED):
+            fields[tag] = child.text
+
+    identifier = fields.get(_ID)
+    return ArxivEntry(
+        arxiv_id=identifier.strip().split("/abs/")[-1] if identifier else "unknown",
+        title=compact_text(fields.get(_TITLE)) or "Untitled",
+        summary=compact_text(fields.get(_SUMMARY)),
+        authors=tuple(authors),
+        categories=tuple(categories),
+        primary_category=fields.get("primary_category"),
+        published=compact_text(fields.get(_PUBLISHED)) or None,
+        updated=compact_text(fields.get(_UPDATED)) or None,
+        pdf_url=fields.get("pdf_url"),
+    )
+
+
+class AtomFeedParser:
+    """Push-style Atom parser: feed it bytes, get back completed entries.
+
+    Works the same for blocking streams (``requests`` ``iter_content``) and
+    async ones (``httpx`` ``aiter_bytes``). ``total_results`` holds the
+    ``opensearch:totalResults`` value once it has been seen.
+    """
+
+    def __init__(self) -> None:
+        self._parser = ET.XMLPullParser(events=("start", "end"))
+        self._root: ET.Element | None = None
+        self.total_results: int | None = None
+
+    def feed(self, data: bytes) -> list[ArxivEntry]:
+        self._parser.feed(data)
+        return self._drain()
+
+    def close(self) -> list[ArxivEntry]:
+        self._parser.close()
+        return self._drain()
+
+    def _drain(self) -> list[ArxivEntry]:
+        entries: list[ArxivEntry] = []
+        for event, element in self._parser.read_events():
+            if event == "start":
+                if self._root is None:
+                    self._root = element
+                continue
+
+            if element.tag == _ENTRY:
+                entries.append(_entry_from_element(element))
+                # Drop the finished entry (and anything before it) from the tree.
+                if self._root is not None:
+                    self._root.clear()
+            elif element.tag == _TOTAL_RESULTS and element.text:
+                self.total_results = int(element.text)
+        return entries
+
+
+def iter_entries(chunks: Iterable[bytes], parser: AtomFeedParser | None = None) -> Iterator[ArxivEntry]:
+    """Yield entries from an iterable of byte chunks as soon as each one closes."""
+
+    parser = parser or AtomFeedParser()
+    for chunk in chunks:
+        if chunk:
+            yield from parser.feed(chunk)
+    yield from parser.close()
@@ -0,0 +1,229 @@
+"""Persistent, content-addressed embedding cache.
+
+Vectors are stored in a local SQLite database keyed by a hash of
+(provider, model, kind, text) so re-ingests, re-embedding migrations and
+repeated queries are served from disk instead of the embedding model. The
+cache is bounded: once it holds more than ``max_entries`` vectors the least
+recently used ones are evicted. The row count is tracked as vectors are
+written and only recounted when it may have crossed the bound, so writes do
+not scan the table.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+import time
+from array import array
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Sequence
+
+from langchain_core.embeddings import Embeddings
+
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+# Evict down to this fraction of max_entries so eviction runs in batches.
+_EVICTION_HEADROOM = 0.9
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS embeddings (
+    key TEXT PRIMARY KEY,
+    vector BLOB NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS embeddings_last_used ON embeddings (last_used);
+"""
+
+
+def _encode(vector: Sequence[float]) -> bytes:
+    return array("f", vector).tobytes()
+
+
+def _decode(blob: bytes) -> list[float]:
+    values = array("f")
+    values.frombytes(blob)
+    return values.tolist()
+
+
+class EmbeddingCache:
+    """SQLite-backed LRU cache of embedding vectors with hit/miss metrics."""
+
+    def __init__(self, path: str | Path, max_entries: int) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max(max_entries, 1)
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Upper bound on the row count (replaced keys and other processes'
+        # writes make it drift); recounted whenever it crosses max_entries.
+        self._estimated_rows: int | None = None
+
+    @staticmethod
+    def key(namespace: str, text: str) -> str:
+        return hashlib.sha256(f"{namespace}\0{text}".encode("utf-8")).hexdigest()
+
+    def get_many(self, keys: Sequence[str]) -> dict[str, list[float]]:
+        if not keys:
+            return {}
+        found: dict[str, list[float]] = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit.
+            for offset in range(0, len(keys), 500):
+                window = keys[offset : offset + 500]
+                placeholders = ",".join("?" * len(window))
+                rows = self._conn.execute(
+                    f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})", window
+                ).fetchall()
+                found.update((key, _decode(blob)) for key, blob in rows)
+            if found:
+                now = time.time()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(now, key) for key in found],
+                )
+                self._conn.commit()
+        return found
+
+    def put_many(self, items: dict[str, Sequence[float]]) -> None:
+        if not items:
+            return
+        now = time.time()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector, last_used) VALUES (?, ?, ?)",
+                [(key, _encode(vector), now) for key, vector in items.items()],
+            )
+            if self._estimated_rows is not None:
+                self._estimated_rows += len(items)
+            self._evict()
+            self._conn.commit()
+
+    def _count(self) -> int:
+        (count,) = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()
+        return count
+
+    def _evict(self) -> None:
+        if self._estimated_rows is not None and self._estimated_rows <= self.max_entries:
+            return
+        count = self._count()
+        self._estimated_rows = count
+        if count <= self.max_entries:
+            return
+        excess = count - int(self.max_entries * _EVICTION_HEADROOM)
+        self._conn.execute(
+            "DELETE FROM embeddings WHERE key IN "
+            "(SELECT key FROM embeddings ORDER BY last_used LIMIT ?)",
+            (excess,),
+        )
+        self._estimated_rows = count - excess
+        self.evictions += excess
+        LOGGER.debug("Evicted %s embeddings from %s", excess, self.path)
+
+    def _plan(self, namespace: str, texts: Sequence[str]) -> tuple[list[str], dict[str, list[float]], dict[str, str]]:
+        keys = [self.key(namespace, text) for text in texts]
+        cached = self.get_many(list(dict.fromkeys(keys)))
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        with self._lock:
+            self.hits += len(keys) - sum(1 for key in keys if key in missing)
+            self.misses += len(missing)
+        return keys, cached, missing
+
+    def get_or_compute(
+        self,
+        namespace: str,
+        texts: Sequence[str],
+        compute: Callable[[list[str]], list[list[float]]],
+    ) -> list[list[float]]:
+        """Return vectors for ``texts``, computing (once per unique text) only the misses."""
+
+        keys, cached, missing = self._plan(namespace, texts)
+        if missing:
+            computed = dict(zip(missing, compute(list(missing.values()))))
+            self.put_many(computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    async def aget_or_compute(
+        self,
+        namespace: str,
+        texts: Sequence[str],
+        compute: Callable[[list[str]], Awaitable[list[list[float]]]],
+    ) -> list[list[float]]:
+        """Async counterpart of :meth:`get_or_compute` for async embedding calls.
+
+        SQLite reads and writes run in a worker thread, off the event loop.
+        """
+
+        keys, cached, missing = await asyncio.to_thread(self._plan, namespace, texts)
+        if missing:
+            computed = dict(zip(missing, await compute(list(missing.values()))))
+            await asyncio.to_thread(self.put_many, computed)
+            cached.update(computed)
+        return [cached[key] for key in keys]
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            entries = self._count()
+            hits, misses, evictions = self.hits, self.misses, self.evictions
+        lookups = hits + misses
+        return {
+            "path": str(self.path),
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "evictions": evictions,
+        }
+
+
+@lru_cache
+def get_embedding_cache() -> EmbeddingCache | None:
+    """Return the process-wide embedding cache, or None when disabled."""
+
+    settings = get_settings()
+    if not settings.embedding_cache_enabled:
+        return None
+    return EmbeddingCache(settings.embedding_cache_path, settings.embedding_cache_max_entries)
+
+
+class CachedEmbeddings(Embeddings):
+    """LangChain ``Embeddings`` wrapper that serves repeated texts from the cache."""
+
+    def __init__(self, inner: Embeddings, cache: EmbeddingCache, namespace: str) -> None:
+        self.inner = inner
+        self.cache = cache
+        self.namespace = namespace
+
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        return self.cache.get_or_compute(
+            f"{self.namespace}:document", texts, self.inner.embed_documents
+        )
+
+    def embed_query(self, text: str) -> list[float]:
+        return self.cache.get_or_compute(
+            f"{self.namespace}:query", [text], lambda texts: [self.inner.embed_query(texts[0])]
+        )[0]
+
+    async def aembed_documents(self, texts: list[str]) -> list[list[float]]:
+        return await self.cache.aget_or_compute(
+            f"{self.namespace}:document", texts, self.inner.aembed_documents
+        )
+
+    async def aembed_query(self, text: str) -> list[float]:
+        async def compute(texts: list[str]) -> list[list[float]]:
+            return [await self.inner.aembed_query(texts[0])]
+
+        return (await self.cache.aget_or_compute(f"{self.namespace}:query", [text], compute))[0]
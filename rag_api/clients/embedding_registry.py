@@ -0,0 +1,97 @@
+"""Registry of embedding model dimensions.
+
+Collection validation and diagnostics need the vector size of the configured
+embedding model. Embedding a probe string to find it out costs a paid API call
+(OpenAI) or a forward pass (HuggingFace), so dimensions come from a table of
+known models first, then from a small JSON file of previously probed models.
+The model is only probed when neither knows it, and the result is persisted.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+KNOWN_DIMENSIONS: dict[str, int] = {
+    "openai/text-embedding-3-small": 1536,
+    "openai/text-embedding-3-large": 3072,
+    "openai/text-embedding-ada-002": 1536,
+    "huggingface/sentence-transformers/all-MiniLM-L6-v2": 384,
+    "huggingface/sentence-transformers/all-MiniLM-L12-v2": 384,
+    "huggingface/sentence-transformers/all-mpnet-base-v2": 768,
+    "huggingface/sentence-transformers/multi-qa-MiniLM-L6-cos-v1": 384,
+    "huggingface/BAAI/bge-small-en-v1.5": 384,
+    "huggingface/BAAI/bge-base-en-v1.5": 768,
+    "huggingface/BAAI/bge-large-en-v1.5": 1024,
+}
+
+_lock = threading.Lock()
+
+
+def _registry_path() -> Path:
+    return Path(get_settings().embedding_registry_path).expanduser()
+
+
+def _load() -> dict[str, dict]:
+    path = _registry_path()
+    if not path.exists():
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as exc:
+        LOGGER.warning("Ignoring unreadable embedding registry %s: %s", path, exc)
+        return {}
+
+
+def record_dimension(namespace: str, dimension: int) -> None:
+    """Persist ``dimension`` for ``namespace`` (``provider/model``)."""
+
+    path = _registry_path()
+    with _lock:
+        registry = _load()
+        registry[namespace] = {"dimension": dimension, "recorded_at": time.time()}
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file.
+        fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=path.name, suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(registry, handle, indent=2, sort_keys=True)
+        os.replace(tmp, path)
+
+
+def lookup_dimension(namespace: str) -> tuple[int | None, str]:
+    """Return ``(dimension, source)`` without touching the model.
+
+    ``source`` is ``"builtin"``, ``"registry"`` or ``"unknown"``.
+    """
+
+    if namespace in KNOWN_DIMENSIONS:
+        return KNOWN_DIMENSIONS[namespace], "builtin"
+    entry = _load().get(namespace)
+    if entry and entry.get("dimension"):
+        return int(entry["dimension"]), "registry"
+    return None, "unknown"
+
+
+def get_embedding_dimension() -> int:
+    """Return the configured model's dimension, probing it once if it is unknown."""
+
+    from rag_api.clients.embeddings import get_embedding_namespace, get_embeddings
+
+    namespace = get_embedding_namespace()
+    dimension, _ = lookup_dimension(namespace)
+    if dimension is not None:
+        return dimension
+
+    LOGGER.info("Probing embedding dimension for %s", namespace)
+    dimension = len(get_embeddings().embed_query("test"))
+    record_dimension(namespace, dimension)
+    return dimension
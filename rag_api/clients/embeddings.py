@@ -17,6 +17,8 @@ try:
 except ImportError:
     HuggingFaceEmbeddings = None
 
+from rag_api.clients.embedding_cache import CachedEmbeddings, get_embedding_cache
+from rag_api.clients.http import get_http_client, get_loop_async_http_client
 from rag_api.settings import get_settings
 
 logger = logging.getLogger(__name__)
@@ -49,9 +51,39 @@ def _get_embedding_model_for_llm(
     return embedding_model
 
 
+def get_embedding_model_name() -> str:
+    """Return the embedding model name for the configured provider."""
+    settings = get_settings()
+
+    if settings.embedding_provider == "openai":
+        return _get_embedding_model_for_llm(
+            llm_model=settings.openai_model,
+            user_override=settings.openai_embedding_model
+        )
+    return settings.huggingface_model
+
+
+def get_embedding_namespace() -> str:
+    """Return the ``provider/model`` key that identifies embeddings in caches."""
+    settings = get_settings()
+    return f"{settings.embedding_provider}/{get_embedding_model_name()}"
+
+
 @lru_cache
 def get_embeddings() -> Embeddings:
-    """Return a cached embedding model instance based on provider settings."""
+    """Return a cached embedding model instance based on provider settings.
+
+    When the embedding cache is enabled the model is wrapped in
+    :class:`CachedEmbeddings`, so repeated texts are served from disk.
+    """
+    embeddings = _build_embeddings()
+    cache = get_embedding_cache()
+    if cache is None:
+        return embeddings
+    return CachedEmbeddings(embeddings, cache, get_embedding_namespace())
+
+
+def _build_embeddings() -> Embeddings:
     settings = get_settings()
 
     if settings.embedding_provider == "openai":
@@ -78,6 +110,8 @@ def get_embeddings() -> Embeddings:
         embeddings = OpenAIEmbeddings(
             model=embedding_model,
             openai_api_key=settings.openai_api_key.strip(),
+            http_client=get_http_client(),
+            http_async_client=get_loop_async_http_client(),
         )
         
         return embeddings
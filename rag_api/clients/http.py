@@ -0,0 +1,132 @@
+"""Shared outbound HTTP connection pools.
+
+Every outbound call (arXiv API, PDF downloads, the OpenAI SDK) goes through
+the long-lived clients built here, so connections are kept alive between
+calls instead of paying a TCP and TLS handshake on every request. There is
+one ``requests.Session`` for the streaming arXiv/PDF code, one sync
+``httpx.Client`` handed to the OpenAI SDK, and one ``httpx.AsyncClient`` per
+event loop for async callers. Clients built before any loop runs (the
+module-level agent) get :func:`get_loop_async_http_client`, which sends each
+request through the running loop's pool. The httpx clients negotiate HTTP/2 when the
+``h2`` package is installed.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import weakref
+from functools import lru_cache
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+# Async clients are bound to the loop they were first used on.
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+@lru_cache
+def http2_available() -> bool:
+    """Whether HTTP/2 is enabled and the ``h2`` package can be imported."""
+
+    if not get_settings().http2_enabled:
+        return False
+    try:
+        import h2  # noqa: F401
+    except ImportError:
+        LOGGER.debug("h2 is not installed; httpx clients will use HTTP/1.1")
+        return False
+    return True
+
+
+def _httpx_options() -> dict:
+    settings = get_settings()
+    return {
+        "http2": http2_available(),
+        "limits": httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        ),
+        "timeout": httpx.Timeout(settings.http_timeout, connect=settings.http_connect_timeout),
+        "follow_redirects": True,
+    }
+
+
+@lru_cache
+def get_http_session() -> requests.Session:
+    """Return the process-wide ``requests`` session (thread-safe for plain requests)."""
+
+    settings = get_settings()
+    # One pool per host, large enough for the widest fan-out that uses it.
+    pool_size = max(settings.http_max_connections, settings.fulltext_download_concurrency)
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+@lru_cache
+def get_http_client() -> httpx.Client:
+    """Return the process-wide sync ``httpx`` client."""
+
+    return httpx.Client(**_httpx_options())
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Return the ``httpx.AsyncClient`` for the running event loop."""
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(**_httpx_options())
+        _async_clients[loop] = client
+    return client
+
+
+class _LoopAsyncClient(httpx.AsyncClient):
+    """``httpx.AsyncClient`` that sends through the running loop's shared client.
+
+    Its own pool stays unused; only request building happens here.
+    """
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        return await get_async_http_client().send(request, **kwargs)
+
+
+@lru_cache
+def get_loop_async_http_client() -> httpx.AsyncClient:
+    """Return an async client usable before any event loop runs.
+
+    For SDK clients built at import time: each request goes through
+    :func:`get_async_http_client` for the loop that sends it.
+    """
+
+    return _LoopAsyncClient(**_httpx_options())
+
+
+def close_http_clients() -> None:
+    """Close the sync pools; the next ``get_*`` call opens fresh ones."""
+
+    if get_http_session.cache_info().currsize:
+        get_http_session().close()
+        get_http_session.cache_clear()
+    if get_http_client.cache_info().currsize:
+        get_http_client().close()
+        get_http_client.cache_clear()
+
+
+async def aclose_async_http_client() -> None:
+    """Close the running loop's async client, if one was opened."""
+
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,59 @@
+"""Maximal marginal relevance (MMR) selection of retrieved chunks.
+
+MMR picks results one at a time, each time taking the candidate with the
+best trade-off between relevance to the query and similarity to what was
+already picked, so the context sent to the LLM is not several near-identical
+chunks of one paper.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence
+
+import numpy as np
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=-1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def mmr_select(
+    query_vector: Sequence[float],
+    candidate_vectors: Sequence[Sequence[float]],
+    k: int,
+    lambda_mult: float = 0.5,
+    relevance: Sequence[float] | None = None,
+) -> list[int]:
+    """Return the indices of ``k`` candidates chosen by MMR, in selection order.
+
+    Each step maximises ``lambda_mult * relevance - (1 - lambda_mult) *
+    max_similarity_to_selected`` using cosine similarity; ``lambda_mult=1``
+    is a plain relevance ranking. ``relevance`` overrides the cosine
+    similarity to the query (e.g. with reranker scores scaled to [0, 1]).
+    """
+
+    if not candidate_vectors or k <= 0:
+        return []
+
+    candidates = _normalize(np.asarray(candidate_vectors, dtype=np.float32))
+    if relevance is None:
+        scores = candidates @ _normalize(np.asarray(query_vector, dtype=np.float32))
+    else:
+        scores = np.asarray(relevance, dtype=np.float32)
+    similarity = candidates @ candidates.T
+
+    selected = [int(np.argmax(scores))]
+    # Highest similarity of each candidate to any selected one so far.
+    redundancy = similarity[selected[0]].copy()
+    available = np.ones(len(candidates), dtype=bool)
+    available[selected[0]] = False
+
+    while len(selected) < min(k, len(candidates)):
+        objective = lambda_mult * scores - (1 - lambda_mult) * redundancy
+        objective[~available] = -np.inf
+        best = int(np.argmax(objective))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
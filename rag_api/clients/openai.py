@@ -1,19 +1,22 @@
 """OpenAI client factory for OpenAI Platform."""
 
 import logging
+from functools import lru_cache
 
 try:
     from openai import OpenAI
 except ImportError:
     OpenAI = None
 
+from rag_api.clients.http import get_http_client
 from rag_api.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache
 def get_openai_client() -> OpenAI:
-    """Create and return configured OpenAI client."""
+    """Return the cached OpenAI client, which uses the shared HTTP connection pool."""
     if OpenAI is None:
         raise ImportError(
             "openai package is not installed. Install it with: uv add openai"
@@ -38,7 +41,7 @@ def get_openai_client() -> OpenAI:
             f"Got: '{api_key_clean[:7]}...'"
         )
     
-    client_kwargs = {"api_key": api_key_clean}
+    client_kwargs = {"api_key": api_key_clean, "http_client": get_http_client()}
     if settings.openai_base_url:
         client_kwargs["base_url"] = settings.openai_base_url
     
@@ -1,15 +1,525 @@
 """Qdrant client utilities."""
 
+from __future__ import annotations
+
+import asyncio
+import dataclasses
+import time
+import weakref
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta, timezone
 from functools import lru_cache
+from typing import Any, Iterable, Literal
 
-from qdrant_client import QdrantClient
+import httpx
+from qdrant_client import AsyncQdrantClient, QdrantClient
+from qdrant_client.http import models
 
+from rag_api.clients.arxiv import split_arxiv_id
+from rag_api.clients.sparse import get_sparse_encoder
 from rag_api.settings import get_settings
 
+Quantization = Literal["none", "scalar", "binary"]
+
+# Named sparse vector holding each chunk's BM25 term weights.
+SPARSE_VECTOR_NAME = "text-sparse"
+
+# Payload fields that searches filter on, indexed when the collection is ensured.
+PAYLOAD_INDEXES: dict[str, models.PayloadSchemaType] = {
+    "metadata.paper_id": models.PayloadSchemaType.KEYWORD,
+    "metadata.categories": models.PayloadSchemaType.KEYWORD,
+    "metadata.primary_category": models.PayloadSchemaType.KEYWORD,
+    "metadata.published": models.PayloadSchemaType.DATETIME,
+}
+
+
+# httpx's own pool defaults, used for whichever limit is left unset: a bare
+# httpx.Limits() field of None means "unlimited".
+_HTTPX_MAX_CONNECTIONS = 100
+_HTTPX_MAX_KEEPALIVE_CONNECTIONS = 20
+
+
+def qdrant_client_options() -> dict[str, Any]:
+    """Keyword arguments shared by the sync and async Qdrant clients.
+
+    ``location`` accepts a URL or ":memory:" for Qdrant's in-process local
+    mode; transport, timeout and pooling settings only apply to a server.
+    """
+
+    settings = get_settings()
+    options: dict[str, Any] = {"location": settings.qdrant_url}
+    if not settings.qdrant_url.startswith(("http://", "https://")):
+        return options
+
+    options.update(prefer_grpc=settings.qdrant_prefer_grpc, grpc_port=settings.qdrant_grpc_port)
+    if settings.qdrant_timeout is not None:
+        options["timeout"] = settings.qdrant_timeout
+    if settings.qdrant_max_connections is not None or settings.qdrant_max_keepalive_connections is not None:
+        options["limits"] = httpx.Limits(
+            max_connections=settings.qdrant_max_connections or _HTTPX_MAX_CONNECTIONS,
+            max_keepalive_connections=(
+                settings.qdrant_max_keepalive_connections
+                if settings.qdrant_max_keepalive_connections is not None
+                else _HTTPX_MAX_KEEPALIVE_CONNECTIONS
+            ),
+        )
+    if settings.qdrant_grpc_keepalive_ms is not None:
+        options["grpc_options"] = {
+            "grpc.keepalive_time_ms": settings.qdrant_grpc_keepalive_ms,
+            "grpc.keepalive_permit_without_calls": 1,
+        }
+    return options
+
 
 @lru_cache
 def get_qdrant_client() -> QdrantClient:
     """Return a cached Qdrant client instance."""
 
+    return QdrantClient(**qdrant_client_options())
+
+
+_async_clients: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, AsyncQdrantClient] = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def get_async_qdrant_client() -> AsyncQdrantClient:
+    """Return the ``AsyncQdrantClient`` for the running event loop.
+
+    With ``":memory:"`` this is a separate in-process store from the one
+    behind :func:`get_qdrant_client`.
+    """
+
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None:
+        client = AsyncQdrantClient(**qdrant_client_options())
+        _async_clients[loop] = client
+    return client
+
+
+@dataclass(frozen=True)
+class CollectionProfile:
+    """Storage and index parameters applied when the collection is created.
+
+    ``None`` leaves a parameter at the Qdrant server default, and is not
+    checked for drift against an existing collection.
+    """
+
+    name: str
+    quantization: Quantization | None = None
+    quantization_always_ram: bool = True
+    rescore: bool = True
+    oversampling: float | None = None
+    on_disk_vectors: bool | None = None
+    on_disk_payload: bool | None = None
+    hnsw_m: int | None = None
+    hnsw_ef_construct: int | None = None
+    segment_number: int | None = None
+    sparse_vectors: bool = False
+
+    def quantization_config(self) -> models.QuantizationConfig | None:
+        if self.quantization == "scalar":
+            return models.ScalarQuantization(
+                scalar=models.ScalarQuantizationConfig(
+                    type=models.ScalarType.INT8, quantile=0.99, always_ram=self.quantization_always_ram
+                )
+            )
+        if self.quantization == "binary":
+            return models.BinaryQuantization(
+                binary=models.BinaryQuantizationConfig(always_ram=self.quantization_always_ram)
+            )
+        return None
+
+    def create_kwargs(self, size: int) -> dict[str, Any]:
+        """Keyword arguments for ``QdrantClient.create_collection``."""
+
+        kwargs: dict[str, Any] = {
+            "vectors_config": models.VectorParams(
+                size=size, distance=models.Distance.COSINE, on_disk=self.on_disk_vectors
+            ),
+        }
+        if self.on_disk_payload is not None:
+            kwargs["on_disk_payload"] = self.on_disk_payload
+        if self.hnsw_m is not None or self.hnsw_ef_construct is not None:
+            kwargs["hnsw_config"] = models.HnswConfigDiff(
+                m=self.hnsw_m, ef_construct=self.hnsw_ef_construct
+            )
+        if self.segment_number is not None:
+            kwargs["optimizers_config"] = models.OptimizersConfigDiff(
+                default_segment_number=self.segment_number
+            )
+        quantization = self.quantization_config()
+        if quantization is not None:
+            kwargs["quantization_config"] = quantization
+        if self.sparse_vectors:
+            kwargs["sparse_vectors_config"] = {
+                SPARSE_VECTOR_NAME: models.SparseVectorParams(modifier=models.Modifier.IDF)
+            }
+        return kwargs
+
+    def search_params(self) -> models.SearchParams | None:
+        """Query-time parameters: rescore quantized candidates with full vectors."""
+
+        if self.quantization in (None, "none"):
+            return None
+        return models.SearchParams(
+            quantization=models.QuantizationSearchParams(
+                rescore=self.rescore, oversampling=self.oversampling
+            )
+        )
+
+    def drift(self, info: models.CollectionInfo) -> list[str]:
+        """Describe every way ``info`` differs from this profile."""
+
+        config = info.config
+        vectors = config.params.vectors
+        actual_quantization = config.quantization_config or getattr(vectors, "quantization_config", None)
+        if isinstance(actual_quantization, models.ScalarQuantization):
+            quantization_kind = "scalar"
+        elif isinstance(actual_quantization, models.BinaryQuantization):
+            quantization_kind = "binary"
+        elif actual_quantization is None:
+            quantization_kind = "none"
+        else:
+            quantization_kind = type(actual_quantization).__name__
+
+        checks = [
+            ("quantization", self.quantization, quantization_kind),
+            ("on_disk_vectors", self.on_disk_vectors, bool(getattr(vectors, "on_disk", False))),
+            ("on_disk_payload", self.on_disk_payload, config.params.on_disk_payload),
+            ("hnsw_m", self.hnsw_m, config.hnsw_config.m),
+            ("hnsw_ef_construct", self.hnsw_ef_construct, config.hnsw_config.ef_construct),
+            (
+                "segment_number",
+                self.segment_number,
+                getattr(config.optimizer_config, "default_segment_number", None),
+            ),
+            (
+                "sparse_vectors",
+                True if self.sparse_vectors else None,
+                SPARSE_VECTOR_NAME in (config.params.sparse_vectors or {}),
+            ),
+        ]
+        return [
+            f"{field}: expected {expected!r}, collection has {actual!r}"
+            for field, expected, actual in checks
+            if expected is not None and expected != actual
+        ]
+
+
+# Built-in starting points; individual QDRANT_* settings override them.
+COLLECTION_PROFILES: dict[str, CollectionProfile] = {
+    # Server defaults: everything in RAM, no quantization.
+    "default": CollectionProfile(name="default"),
+    # int8 vectors in RAM for fast search, originals and payloads on disk.
+    "balanced": CollectionProfile(
+        name="balanced",
+        quantization="scalar",
+        oversampling=2.0,
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        hnsw_m=16,
+        hnsw_ef_construct=128,
+    ),
+    # 1-bit vectors in RAM (best with >= 1024-dim embeddings), heavy
+    # oversampling and rescoring against the on-disk originals.
+    "large": CollectionProfile(
+        name="large",
+        quantization="binary",
+        oversampling=3.0,
+        on_disk_vectors=True,
+        on_disk_payload=True,
+        hnsw_m=32,
+        hnsw_ef_construct=256,
+        segment_number=8,
+    ),
+}
+
+
+@lru_cache
+def get_collection_profile() -> CollectionProfile:
+    """Return the configured collection profile with per-setting overrides applied."""
+
     settings = get_settings()
-    return QdrantClient(url=settings.qdrant_url)
+    base = COLLECTION_PROFILES.get(settings.qdrant_collection_profile)
+    if base is None:
+        raise ValueError(
+            f"Unknown QDRANT_COLLECTION_PROFILE '{settings.qdrant_collection_profile}'; "
+            f"expected one of {sorted(COLLECTION_PROFILES)}"
+        )
+    overrides = {
+        "quantization": settings.qdrant_quantization,
+        "oversampling": settings.qdrant_quantization_oversampling,
+        "on_disk_vectors": settings.qdrant_on_disk_vectors,
+        "on_disk_payload": settings.qdrant_on_disk_payload,
+        "hnsw_m": settings.qdrant_hnsw_m,
+        "hnsw_ef_construct": settings.qdrant_hnsw_ef_construct,
+        "segment_number": settings.qdrant_segment_number,
+    }
+    return dataclasses.replace(
+        base,
+        rescore=settings.qdrant_quantization_rescore,
+        sparse_vectors=settings.hybrid_search_enabled,
+        **{field: value for field, value in overrides.items() if value is not None},
+    )
+
+
+def get_search_params() -> models.SearchParams | None:
+    """Search parameters matching the configured collection profile."""
+
+    return get_collection_profile().search_params()
+
+
+# How long a collection's sparse-vector support is remembered, so a
+# collection recreated by ingestion is picked up without a restart.
+_SPARSE_STATUS_TTL = 60.0
+_sparse_status: dict[str, tuple[bool, float]] = {}
+
+
+def _cached_sparse_status(collection: str) -> bool | None:
+    cached = _sparse_status.get(collection)
+    if cached is not None and time.monotonic() - cached[1] < _SPARSE_STATUS_TTL:
+        return cached[0]
+    return None
+
+
+def _record_sparse_status(collection: str, info: models.CollectionInfo) -> bool:
+    ready = SPARSE_VECTOR_NAME in (info.config.params.sparse_vectors or {})
+    _sparse_status[collection] = (ready, time.monotonic())
+    return ready
+
+
+def hybrid_search_ready() -> bool:
+    """Whether hybrid search is enabled and the collection has the sparse vector.
+
+    Collections created before hybrid search was enabled only hold dense
+    vectors; they keep working with dense-only search and writes.
+    """
+
+    if not get_collection_profile().sparse_vectors:
+        return False
+    collection = get_settings().qdrant_collection
+    cached = _cached_sparse_status(collection)
+    if cached is not None:
+        return cached
+    client = get_qdrant_client()
+    if not client.collection_exists(collection):
+        return False
+    return _record_sparse_status(collection, client.get_collection(collection))
+
+
+async def ahybrid_search_ready() -> bool:
+    """Async counterpart of :func:`hybrid_search_ready`."""
+
+    if not get_collection_profile().sparse_vectors:
+        return False
+    collection = get_settings().qdrant_collection
+    cached = _cached_sparse_status(collection)
+    if cached is not None:
+        return cached
+    client = get_async_qdrant_client()
+    if not await client.collection_exists(collection):
+        return False
+    return _record_sparse_status(collection, await client.get_collection(collection))
+
+
+def reset_hybrid_search_status() -> None:
+    """Forget cached sparse-vector support (after creating a collection)."""
+
+    _sparse_status.clear()
+
+
+def _search_query(
+    query_text: str,
+    query_vector: list[float],
+    limit: int,
+    query_filter: models.Filter | None,
+    hybrid: bool,
+) -> dict[str, Any]:
+    """Keyword arguments of the dense or hybrid query shared by every search."""
+
+    sparse_vector = get_sparse_encoder().encode_query(query_text) if hybrid else None
+    if sparse_vector is None or not sparse_vector.indices:
+        return {"query": query_vector, "query_filter": query_filter, "search_params": get_search_params()}
+
+    prefetch_limit = max(get_settings().hybrid_prefetch_limit, limit)
+    return {
+        "prefetch": [
+            models.Prefetch(
+                query=query_vector, filter=query_filter, limit=prefetch_limit, params=get_search_params()
+            ),
+            models.Prefetch(
+                query=sparse_vector, using=SPARSE_VECTOR_NAME, filter=query_filter, limit=prefetch_limit
+            ),
+        ],
+        "query": models.FusionQuery(fusion=models.Fusion.RRF),
+    }
+
+
+def search_points(
+    query_text: str,
+    query_vector: list[float],
+    limit: int,
+    query_filter: models.Filter | None = None,
+    with_vectors: bool = False,
+) -> list[models.ScoredPoint]:
+    """Search the configured collection for ``query_text``.
+
+    With hybrid search, the dense and sparse (BM25) searches run as two
+    prefetches of a single Qdrant query and are fused with reciprocal rank
+    fusion, so exact terms that embed poorly (acronyms, method names, arXiv
+    IDs) still surface. Otherwise this is a plain dense search.
+    """
+
+    return get_qdrant_client().query_points(
+        collection_name=get_settings().qdrant_collection,
+        limit=limit,
+        with_vectors=with_vectors,
+        **_search_query(query_text, query_vector, limit, query_filter, hybrid_search_ready()),
+    ).points
+
+
+async def asearch_points(
+    query_text: str,
+    query_vector: list[float],
+    limit: int,
+    query_filter: models.Filter | None = None,
+    with_vectors: bool = False,
+) -> list[models.ScoredPoint]:
+    """Async counterpart of :func:`search_points`."""
+
+    hybrid = await ahybrid_search_ready()
+    response = await get_async_qdrant_client().query_points(
+        collection_name=get_settings().qdrant_collection,
+        limit=limit,
+        with_vectors=with_vectors,
+        **_search_query(query_text, query_vector, limit, query_filter, hybrid),
+    )
+    return response.points
+
+
+def _group_hits(groups: list[models.PointGroup], limit: int) -> list[models.ScoredPoint]:
+    hits = [hit for group in groups for hit in group.hits]
+    hits.sort(key=lambda hit: hit.score, reverse=True)
+    return hits[:limit]
+
+
+def search_grouped_points(
+    query_text: str,
+    query_vector: list[float],
+    limit: int,
+    group_size: int,
+    query_filter: models.Filter | None = None,
+    with_vectors: bool = False,
+    group_by: str = "metadata.paper_id",
+) -> list[models.ScoredPoint]:
+    """Like :func:`search_points`, but with at most ``group_size`` points per ``group_by`` value.
+
+    Uses Qdrant's group-by search over ``limit`` groups and returns their
+    points best first, at most ``limit`` of them. Points without the
+    ``group_by`` field are not returned.
+    """
+
+    groups = get_qdrant_client().query_points_groups(
+        collection_name=get_settings().qdrant_collection,
+        group_by=group_by,
+        group_size=group_size,
+        limit=limit,
+        with_vectors=with_vectors,
+        **_search_query(query_text, query_vector, limit, query_filter, hybrid_search_ready()),
+    ).groups
+    return _group_hits(groups, limit)
+
+
+async def asearch_grouped_points(
+    query_text: str,
+    query_vector: list[float],
+    limit: int,
+    group_size: int,
+    query_filter: models.Filter | None = None,
+    with_vectors: bool = False,
+    group_by: str = "metadata.paper_id",
+) -> list[models.ScoredPoint]:
+    """Async counterpart of :func:`search_grouped_points`."""
+
+    hybrid = await ahybrid_search_ready()
+    response = await get_async_qdrant_client().query_points_groups(
+        collection_name=get_settings().qdrant_collection,
+        group_by=group_by,
+        group_size=group_size,
+        limit=limit,
+        with_vectors=with_vectors,
+        **_search_query(query_text, query_vector, limit, query_filter, hybrid),
+    )
+    return _group_hits(response.groups, limit)
+
+
+def dense_vector(point: models.ScoredPoint) -> list[float] | None:
+    """Return the dense embedding of a point fetched ``with_vectors``."""
+
+    vector = point.vector
+    if isinstance(vector, dict):
+        vector = vector.get("")
+    return vector if isinstance(vector, list) else None
+
+
+def parse_date_bound(value: str, name: str) -> tuple[datetime, bool]:
+    """Parse an ISO date or timestamp; return it (UTC if naive) and whether it was date-only.
+
+    Raises ``ValueError`` naming ``name`` when ``value`` is not ISO 8601.
+    """
+
+    text = value.strip()
+    try:
+        if len(text) == 10:
+            parsed = date.fromisoformat(text)
+            return datetime(parsed.year, parsed.month, parsed.day, tzinfo=timezone.utc), True
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(
+            f"{name} must be an ISO date like 2024-01-31 or a timestamp like 2024-01-31T12:00:00Z, got {value!r}"
+        ) from None
+    return (moment if moment.tzinfo else moment.replace(tzinfo=timezone.utc)), False
+
+
+def build_search_filter(
+    categories: Iterable[str] | None = None,
+    published_after: str | None = None,
+    published_before: str | None = None,
+    arxiv_ids: Iterable[str] | None = None,
+) -> models.Filter | None:
+    """Build a Qdrant filter over the indexed paper metadata, or None if unfiltered.
+
+    ``categories`` matches papers listed in any of the given arXiv categories;
+    ``published_after``/``published_before`` are inclusive ISO dates or
+    timestamps (a date-only ``published_before`` includes that whole day);
+    ``arxiv_ids`` match any version of the given papers. Raises
+    ``ValueError`` for a malformed date.
+    """
+
+    conditions: list[models.Condition] = []
+    categories = [category.strip() for category in categories or [] if category.strip()]
+    if categories:
+        conditions.append(
+            models.FieldCondition(key="metadata.categories", match=models.MatchAny(any=categories))
+        )
+    if (published_after and published_after.strip()) or (published_before and published_before.strip()):
+        bounds: dict[str, datetime] = {}
+        if published_after and published_after.strip():
+            bounds["gte"], _ = parse_date_bound(published_after, "published_after")
+        if published_before and published_before.strip():
+            before, date_only = parse_date_bound(published_before, "published_before")
+            if date_only:
+                bounds["lt"] = before + timedelta(days=1)
+            else:
+                bounds["lte"] = before
+        conditions.append(
+            models.FieldCondition(key="metadata.published", range=models.DatetimeRange(**bounds))
+        )
+    paper_ids = [split_arxiv_id(arxiv_id)[0] for arxiv_id in arxiv_ids or [] if arxiv_id.strip()]
+    if paper_ids:
+        conditions.append(
+            models.FieldCondition(key="metadata.paper_id", match=models.MatchAny(any=paper_ids))
+        )
+    return models.Filter(must=conditions) if conditions else None
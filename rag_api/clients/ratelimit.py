@@ -0,0 +1,169 @@
+"""Token-bucket rate limiting shared across threads and processes.
+
+Bucket state lives in a small SQLite database, so every worker process on a
+host (ingestion jobs, CLI runs, the agent's tools) draws from the same
+bucket. Each call reserves a token in one short write transaction and then
+sleeps until its reservation comes due, which keeps waiters in arrival order
+without polling.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import logging
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from pathlib import Path
+from typing import Any
+
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS buckets (
+    name TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Recent waits kept for percentile reporting.
+_WAIT_WINDOW = 1000
+
+
+def _percentile(ordered: list[float], q: float) -> float:
+    if not ordered:
+        return 0.0
+    return round(ordered[min(int(q * len(ordered)), len(ordered) - 1)], 3)
+
+
+class TokenBucket:
+    """A named token bucket refilled at ``rate`` tokens/sec up to ``burst`` tokens."""
+
+    def __init__(self, path: str | Path, name: str, rate: float, burst: int = 1) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.name = name
+        self.rate = rate
+        self.burst = max(burst, 1)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(
+            self.path, timeout=30, check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+
+        self.acquired = 0
+        self.waited = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+        self._recent_waits: deque[float] = deque(maxlen=_WAIT_WINDOW)
+
+    def _reserve(self) -> float:
+        """Take one token, possibly on credit, and return how long to wait for it."""
+
+        if self.rate <= 0:
+            return 0.0
+        with self._lock:
+            # BEGIN IMMEDIATE serialises reservations across processes.
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                now = time.time()
+                row = self._conn.execute(
+                    "SELECT tokens, updated_at FROM buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                tokens = float(self.burst) if row is None else row[0]
+                if row is not None:
+                    tokens = min(float(self.burst), tokens + (now - row[1]) * self.rate)
+                tokens -= 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO buckets (name, tokens, updated_at) VALUES (?, ?, ?)",
+                    (self.name, tokens, now),
+                )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return max(-tokens / self.rate, 0.0)
+
+    def _record(self, wait: float) -> None:
+        with self._lock:
+            self.acquired += 1
+            if wait > 0:
+                self.waited += 1
+            self.total_wait += wait
+            self.max_wait = max(self.max_wait, wait)
+            self._recent_waits.append(wait)
+
+    def acquire(self) -> float:
+        """Block until a token is available; return the seconds spent waiting."""
+
+        wait = self._reserve()
+        if wait > 0:
+            LOGGER.debug("Rate limiter '%s': waiting %.2fs", self.name, wait)
+            time.sleep(wait)
+        self._record(wait)
+        return wait
+
+    async def acquire_async(self) -> float:
+        """Async counterpart of :meth:`acquire` that sleeps without blocking the loop."""
+
+        wait = await asyncio.to_thread(self._reserve)
+        if wait > 0:
+            LOGGER.debug("Rate limiter '%s': waiting %.2fs", self.name, wait)
+            await asyncio.sleep(wait)
+        self._record(wait)
+        return wait
+
+    def stats(self) -> dict[str, Any]:
+        """Queue-wait metrics for this process."""
+
+        with self._lock:
+            recent = sorted(self._recent_waits)
+        return {
+            "name": self.name,
+            "rate_per_sec": self.rate,
+            "burst": self.burst,
+            "acquired": self.acquired,
+            "waited": self.waited,
+            "total_wait_seconds": round(self.total_wait, 3),
+            "mean_wait_seconds": round(self.total_wait / self.acquired, 3) if self.acquired else 0.0,
+            "p50_wait_seconds": _percentile(recent, 0.5),
+            "p95_wait_seconds": _percentile(recent, 0.95),
+            "max_wait_seconds": round(self.max_wait, 3),
+        }
+
+
+@lru_cache
+def get_arxiv_rate_limiter() -> TokenBucket:
+    """Return the limiter every arXiv API caller on this host goes through."""
+
+    settings = get_settings()
+    interval = settings.arxiv_request_interval
+    return TokenBucket(
+        settings.rate_limit_state_path,
+        "arxiv_api",
+        rate=1 / interval if interval > 0 else 0.0,
+        burst=settings.arxiv_rate_limit_burst,
+    )
+
+
+@lru_cache
+def get_arxiv_pdf_rate_limiter() -> TokenBucket:
+    """Return the limiter every arXiv PDF download on this host goes through.
+
+    PDFs get their own bucket so full-text runs do not starve API paging.
+    """
+
+    settings = get_settings()
+    interval = settings.arxiv_pdf_request_interval
+    return TokenBucket(
+        settings.rate_limit_state_path,
+        "arxiv_pdf",
+        rate=1 / interval if interval > 0 else 0.0,
+        burst=settings.arxiv_pdf_rate_limit_burst,
+    )
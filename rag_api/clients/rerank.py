@@ -0,0 +1,71 @@
+"""Cross-encoder reranking of retrieved chunks on CPU.
+
+A cross-encoder reads the query and a chunk together, so it ranks far more
+precisely than the vector search that produced the candidates, at the cost
+of one forward pass per pair. Pairs are scored in batches of
+``rerank_batch_size`` on a bounded pool of ``rerank_workers`` threads
+(PyTorch releases the GIL during inference).
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Sequence
+
+from rag_api.settings import get_settings
+
+try:
+    from sentence_transformers import CrossEncoder
+except ImportError:
+    CrossEncoder = None
+
+LOGGER = logging.getLogger(__name__)
+
+
+class CrossEncoderReranker:
+    """Score (query, passage) pairs with a cross-encoder."""
+
+    def __init__(self, model, batch_size: int = 16, workers: int = 2) -> None:
+        self.model = model
+        self.batch_size = max(batch_size, 1)
+        self._pool = ThreadPoolExecutor(max_workers=max(workers, 1), thread_name_prefix="rerank")
+
+    def _predict(self, pairs: list[tuple[str, str]]) -> list[float]:
+        scores = self.model.predict(pairs, batch_size=len(pairs), show_progress_bar=False)
+        return [float(score) for score in scores]
+
+    def score(self, query: str, passages: Sequence[str]) -> list[float]:
+        """Return one relevance score per passage, in input order."""
+
+        pairs = [(query, passage) for passage in passages]
+        batches = [pairs[i : i + self.batch_size] for i in range(0, len(pairs), self.batch_size)]
+        if len(batches) <= 1:
+            return self._predict(batches[0]) if batches else []
+        scores: list[float] = []
+        for batch_scores in self._pool.map(self._predict, batches):
+            scores.extend(batch_scores)
+        return scores
+
+
+@lru_cache
+def get_reranker() -> CrossEncoderReranker:
+    """Return the process-wide reranker for the configured cross-encoder."""
+
+    if CrossEncoder is None:
+        raise ImportError(
+            "sentence-transformers is not installed. Install it with: uv add sentence-transformers"
+        )
+
+    settings = get_settings()
+    # Force CPU usage to avoid CUDA compatibility issues
+    os.environ["CUDA_VISIBLE_DEVICES"] = ""
+    LOGGER.info("Loading cross-encoder '%s'", settings.rerank_model)
+    model = CrossEncoder(
+        settings.rerank_model, device="cpu", max_length=settings.rerank_max_length
+    )
+    return CrossEncoderReranker(
+        model, batch_size=settings.rerank_batch_size, workers=settings.rerank_workers
+    )
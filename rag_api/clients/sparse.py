@@ -0,0 +1,86 @@
+"""BM25-style sparse vectors computed locally for lexical retrieval.
+
+Text is split into lowercase terms; compound terms such as ``bert-large`` or
+``2401.01234`` are kept whole as well as split into their parts, so method
+names, acronyms and arXiv IDs match exactly. Each term is hashed to a 32-bit
+sparse index. Document weights are BM25's saturated, length-normalised term
+frequency; the collection's ``IDF`` modifier makes Qdrant apply inverse
+document frequency at query time, so no corpus statistics are kept here.
+"""
+
+from __future__ import annotations
+
+import re
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from functools import lru_cache
+
+from qdrant_client.http import models
+
+from rag_api.settings import get_settings
+
+_TERM = re.compile(r"[a-z0-9]+(?:[.\-_/][a-z0-9]+)*")
+_PART = re.compile(r"[a-z0-9]+")
+
+STOPWORDS = frozenset(
+    "a an and are as at be been by can for from has have in into is it its of on or our over "
+    "such than that the their these this those to via was we were which while with".split()
+)
+
+
+def terms(text: str) -> list[str]:
+    """Return the lexical terms of ``text``, with repeats."""
+
+    found: list[str] = []
+    for token in _TERM.findall(text.lower()):
+        if token.isalnum():
+            parts = [token]
+        else:
+            found.append(token)
+            parts = _PART.findall(token)
+        found.extend(
+            part for part in parts if part not in STOPWORDS and (len(part) > 1 or part.isdigit())
+        )
+    return found
+
+
+def term_index(term: str) -> int:
+    """Sparse vector index of ``term``."""
+
+    return zlib.crc32(term.encode("utf-8"))
+
+
+@dataclass(frozen=True)
+class BM25Encoder:
+    """Encode documents and queries as sparse vectors for an ``IDF``-modified collection."""
+
+    k1: float = 1.2
+    b: float = 0.75
+    avg_doc_length: float = 256.0
+
+    def encode_document(self, text: str) -> models.SparseVector:
+        counts = Counter(term_index(term) for term in terms(text))
+        length = sum(counts.values())
+        norm = self.k1 * (1 - self.b + self.b * length / self.avg_doc_length)
+        indices = sorted(counts)
+        return models.SparseVector(
+            indices=indices,
+            values=[counts[index] * (self.k1 + 1) / (counts[index] + norm) for index in indices],
+        )
+
+    def encode_query(self, text: str) -> models.SparseVector:
+        indices = sorted({term_index(term) for term in terms(text)})
+        return models.SparseVector(indices=indices, values=[1.0] * len(indices))
+
+
+@lru_cache
+def get_sparse_encoder() -> BM25Encoder:
+    """Return the encoder configured by the ``bm25_*`` settings."""
+
+    settings = get_settings()
+    return BM25Encoder(
+        k1=settings.bm25_k1,
+        b=settings.bm25_b,
+        avg_doc_length=settings.bm25_avg_doc_length or float(settings.chunk_size_tokens),
+    )
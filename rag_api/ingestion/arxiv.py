@@ -2,14 +2,23 @@
 
 from __future__ import annotations
 
-from typing import List
-from xml.etree import ElementTree as ET
+import logging
+from typing import Any, Iterator, List
 
-import requests
 from langchain_community.document_loaders import ArxivLoader
 from langchain_core.documents import Document
 from tenacity import retry, stop_after_attempt, wait_exponential
 
+from rag_api.clients.arxiv import (
+    STREAM_CHUNK_SIZE,
+    AtomFeedParser,
+    ArxivEntry,
+    iter_entries,
+)
+from rag_api.clients.http import get_http_session
+from rag_api.clients.ratelimit import get_arxiv_rate_limiter
+from rag_api.settings import get_settings
+
 try:
     import fitz
     if not hasattr(fitz, "fitz"):
@@ -17,47 +26,122 @@ try:
 except ImportError:
     pass
 
+LOGGER = logging.getLogger(__name__)
+
+ARXIV_MAX_PAGE_SIZE = 2000  # arXiv rejects larger max_results windows
+ARXIV_MAX_RESULTS = 30000  # arXiv stops paging past this offset
+
+
+def entry_to_document(entry: ArxivEntry) -> Document:
+    """Convert a parsed feed entry into an abstract-only ``Document``."""
+
+    return Document(
+        page_content=entry.summary,
+        metadata={
+            "title": entry.title,
+            "arxiv_id": entry.arxiv_id,
+            "paper_id": entry.paper_id,
+            "version": entry.version,
+            "source": entry.abs_url,
+            "pdf_url": entry.pdf_url,
+            "published": entry.published,
+            "categories": list(entry.categories),
+            "primary_category": entry.primary_category,
+        },
+    )
 
-def _fetch_via_api(query: str, max_docs: int) -> List[Document]:
-    """Fallback loader using the public arXiv API."""
 
-    api_url = "https://export.arxiv.org/api/query"
+@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
+def _fetch_via_api(
+    query: str, max_docs: int, start: int = 0, newest_first: bool = False
+) -> tuple[List[Document], int]:
+    """Fetch one ``start``/``max_results`` window from the public arXiv API.
+
+    Returns the page of documents and the total result count reported by arXiv.
+    With ``newest_first`` results are sorted by submission date, descending,
+    instead of by relevance.
+    """
+
     params = {
         "search_query": query,
-        "start": 0,
+        "start": start,
         "max_results": max_docs,
     }
-    response = requests.get(api_url, params=params, timeout=30)
-    response.raise_for_status()
-
-    root = ET.fromstring(response.content)
-    entries = root.findall("{http://www.w3.org/2005/Atom}entry")
-    documents: List[Document] = []
-
-    for entry in entries[:max_docs]:
-        title = entry.find("{http://www.w3.org/2005/Atom}title")
-        summary = entry.find("{http://www.w3.org/2005/Atom}summary")
-        identifier = entry.find("{http://www.w3.org/2005/Atom}id")
-
-        doc_title = title.text if title is not None else "Untitled"
-        doc_summary = summary.text if summary is not None else ""
-        doc_id = identifier.text.split("/")[-1] if identifier is not None else "unknown"
-
-        documents.append(
-            Document(
-                page_content=doc_summary.strip(),
-                metadata={
-                    "title": doc_title.strip(),
-                    "arxiv_id": doc_id,
-                    "source": f"https://arxiv.org/abs/{doc_id}",
-                },
-            )
+    if newest_first:
+        params["sortBy"] = "submittedDate"
+        params["sortOrder"] = "descending"
+    get_arxiv_rate_limiter().acquire()
+    with get_http_session().get(get_settings().arxiv_api_url, params=params, timeout=30, stream=True) as response:
+        response.raise_for_status()
+        parser = AtomFeedParser()
+        documents = [
+            entry_to_document(entry)
+            for entry in iter_entries(response.iter_content(STREAM_CHUNK_SIZE), parser)
+        ][:max_docs]
+
+    total_results = parser.total_results or 0
+    return documents, total_results
+
+
+def iter_documents(
+    query: str,
+    max_docs: int,
+    page_size: int | None = None,
+    since: str | None = None,
+    newest_first: bool = False,
+    start: int = 0,
+    progress: dict[str, Any] | None = None,
+) -> Iterator[Document]:
+    """Yield up to ``max_docs`` documents, paging through the arXiv API lazily.
+
+    Only one page is held in memory at a time, so callers that consume the
+    generator incrementally (see ``run_ingestion``) run in flat memory.
+
+    ``since`` (an ISO timestamp, e.g. a previous run's newest ``published``)
+    requests results newest first and stops paging at the first paper
+    submitted before it. Papers submitted at exactly ``since`` are yielded
+    again; the upsert skips them as unchanged.
+
+    ``start`` skips that many results of the listing (a resumed run's
+    cursor); ``max_docs`` still counts from the top of the listing.
+
+    ``progress["complete"]`` is set to True once paging ends because it
+    reached ``since`` or ran out of results, and stays False when it stopped
+    at ``max_docs`` (or arXiv's paging limit) with older results left.
+    """
+
+    settings = get_settings()
+    window = min(max(page_size or settings.arxiv_page_size, 1), ARXIV_MAX_PAGE_SIZE)
+    limit = min(max_docs, ARXIV_MAX_RESULTS)
+    newest_first = newest_first or since is not None
+    progress = progress if progress is not None else {}
+    progress["complete"] = False
+
+    while start < limit:
+        documents, total_results = _fetch_via_api(
+            query, min(window, limit - start), start=start, newest_first=newest_first
         )
+        LOGGER.debug(
+            "Fetched %s documents for query '%s' (start=%s, total=%s)",
+            len(documents),
+            query,
+            start,
+            total_results,
+        )
+        for document in documents:
+            published = document.metadata.get("published")
+            if since is not None and published is not None and published < since:
+                LOGGER.debug("Reached high-water mark %s for query '%s'", since, query)
+                progress["complete"] = True
+                return
+            yield document
 
-    return documents
+        start += len(documents)
+        if not documents or start >= total_results:
+            progress["complete"] = True
+            break
 
 
-@retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=4, max=10))
 def load_documents(query: str, max_docs: int) -> List[Document]:
     """Load arXiv documents using the API (ArxivLoader doesn't support max_docs parameter)."""
-    return _fetch_via_api(query, max_docs)
+    return list(iter_documents(query, max_docs))
@@ -0,0 +1,169 @@
+"""Token-aware chunking between document loading and upsert.
+
+Text is split on section (blank line) and sentence boundaries and the pieces
+are packed into chunks of roughly ``chunk_size_tokens`` tokens, with the last
+``chunk_overlap_tokens`` worth of sentences repeated at the start of the next
+chunk. Every chunk is an exact substring of the source text; its index and
+character offsets are recorded in the metadata.
+"""
+
+from __future__ import annotations
+
+import logging
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Callable, Iterable, Iterator
+
+from langchain_core.documents import Document
+
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+_SECTION_BREAK = re.compile(r"\n\s*\n")
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?])[\"')\]]*\s+(?=[\"'(\[]?[A-Z0-9])")
+_WORD = re.compile(r"\S+")
+_APPROX_TOKEN = re.compile(r"\w+|[^\w\s]")
+
+
+@lru_cache
+def get_token_counter() -> Callable[[str], int]:
+    """Return a token counting function.
+
+    Uses tiktoken's ``cl100k_base`` when it is installed and its encoding file
+    is available, and otherwise falls back to counting words and punctuation,
+    which tracks BPE counts closely enough for sizing chunks offline.
+    """
+
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.info("tiktoken unavailable (%s); using approximate token counts", exc)
+        return lambda text: len(_APPROX_TOKEN.findall(text))
+
+    return lambda text: len(encoding.encode(text, disallowed_special=()))
+
+
+@dataclass(slots=True)
+class _Unit:
+    start: int
+    end: int
+    tokens: int
+    section_start: bool
+
+
+def _spans(text: str, pattern: re.Pattern[str], start: int, end: int) -> Iterator[tuple[int, int]]:
+    position = start
+    for match in pattern.finditer(text, start, end):
+        if match.start() > position:
+            yield position, match.start()
+        position = match.end()
+    if end > position:
+        yield position, end
+
+
+def _units(text: str, target: int, count_tokens: Callable[[str], int]) -> list[_Unit]:
+    """Split ``text`` into sentence-sized units no larger than ``target`` tokens."""
+
+    units: list[_Unit] = []
+    for section_start, section_end in _spans(text, _SECTION_BREAK, 0, len(text)):
+        first = True
+        for start, end in _spans(text, _SENTENCE_BREAK, section_start, section_end):
+            tokens = count_tokens(text[start:end])
+            if tokens <= target:
+                units.append(_Unit(start, end, tokens, first))
+                first = False
+                continue
+
+            # A single over-long "sentence" (tables, equations, run-on text):
+            # fall back to word windows.
+            words = [match.span() for match in _WORD.finditer(text, start, end)]
+            step = max(int(len(words) * target / tokens), 1)
+            for offset in range(0, len(words), step):
+                window = words[offset : offset + step]
+                window_start, window_end = window[0][0], window[-1][1]
+                units.append(
+                    _Unit(window_start, window_end, count_tokens(text[window_start:window_end]), first)
+                )
+                first = False
+    return units
+
+
+def split_text(
+    text: str,
+    chunk_size: int,
+    chunk_overlap: int = 0,
+    count_tokens: Callable[[str], int] | None = None,
+) -> list[tuple[int, int]]:
+    """Return ``(start, end)`` character spans of token-bounded chunks of ``text``."""
+
+    count_tokens = count_tokens or get_token_counter()
+    chunk_size = max(chunk_size, 1)
+    chunk_overlap = min(max(chunk_overlap, 0), chunk_size // 2)
+
+    units = _units(text, chunk_size, count_tokens)
+    if not units:
+        return []
+
+    chunks: list[tuple[int, int]] = []
+    current: list[_Unit] = []
+    current_tokens = 0
+
+    for unit in units:
+        # Prefer closing a reasonably full chunk at a section boundary rather
+        # than straddling two sections.
+        at_section = unit.section_start and current_tokens >= chunk_size // 2
+        if current and (current_tokens + unit.tokens > chunk_size or at_section):
+            chunks.append((current[0].start, current[-1].end))
+
+            carried: list[_Unit] = []
+            carried_tokens = 0
+            if not at_section:
+                for previous in reversed(current):
+                    if carried_tokens + previous.tokens > chunk_overlap:
+                        break
+                    carried.insert(0, previous)
+                    carried_tokens += previous.tokens
+                while carried and carried_tokens + unit.tokens > chunk_size:
+                    carried_tokens -= carried.pop(0).tokens
+            current, current_tokens = carried, carried_tokens
+
+        current.append(unit)
+        current_tokens += unit.tokens
+
+    chunks.append((current[0].start, current[-1].end))
+    return chunks
+
+
+def chunk_documents(
+    documents: Iterable[Document],
+    chunk_size: int | None = None,
+    chunk_overlap: int | None = None,
+) -> Iterator[Document]:
+    """Lazily split each document into overlapping, token-bounded chunks."""
+
+    settings = get_settings()
+    size = chunk_size or settings.chunk_size_tokens
+    overlap = settings.chunk_overlap_tokens if chunk_overlap is None else chunk_overlap
+    count_tokens = get_token_counter()
+
+    for document in documents:
+        text = document.page_content
+        spans = split_text(text, size, overlap, count_tokens)
+        if not spans:
+            LOGGER.debug("Skipping empty document %s", document.metadata.get("arxiv_id"))
+            continue
+        for index, (start, end) in enumerate(spans):
+            yield Document(
+                page_content=text[start:end],
+                metadata={
+                    **document.metadata,
+                    "chunk_index": index,
+                    "chunk_count": len(spans),
+                    "chunk_start": start,
+                    "chunk_end": end,
+                },
+            )
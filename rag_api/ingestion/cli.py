@@ -3,19 +3,44 @@
 from __future__ import annotations
 
 import logging
+from pathlib import Path
 
 import typer
+from rich.console import Console
+from rich.table import Table
 
-from rag_api.ingestion.arxiv import load_documents
-from rag_api.ingestion.store import ensure_collection, upsert_documents
+from rag_api.ingestion.pipeline import run_bulk_ingestion, run_ingestion, run_snapshot_ingestion
+from rag_api.ingestion.store import delete_legacy_points
 from rag_api.logging import configure_logging
 from rag_api.settings import get_settings
 
 app = typer.Typer(help="Ingest arXiv documents into Qdrant.")
+bulk_app = typer.Typer(help="Ingest many arXiv queries into Qdrant in one run.")
+snapshot_app = typer.Typer(help="Ingest a local arXiv metadata snapshot into Qdrant.")
 
 
 @app.command()
-def run(query: str | None = None, max_docs: int | None = None) -> None:
+def run(
+    query: str | None = None,
+    max_docs: int | None = None,
+    full_text: bool = typer.Option(False, help="Ingest PDF full text instead of abstracts"),
+    pdf_dir: str | None = typer.Option(None, help="Read full text from a local directory of PDFs"),
+    incremental: bool | None = typer.Option(
+        None,
+        "--incremental/--no-incremental",
+        help="Fetch newest first and only papers newer than the query's last run "
+        "(default: INCREMENTAL_INGESTION)",
+    ),
+    full_refresh: bool = typer.Option(
+        False, help="Ignore the query's high-water mark and re-fetch the newest max_docs papers"
+    ),
+    resume: bool = typer.Option(
+        False, help="Continue the query's last failed run from its last checkpoint"
+    ),
+    drop_legacy_points: bool = typer.Option(
+        False, help="First delete points stored with random IDs by older versions (no content hash)"
+    ),
+) -> None:
     """Run the ingestion pipeline for a query."""
 
     settings = get_settings()
@@ -30,24 +55,159 @@ def run(query: str | None = None, max_docs: int | None = None) -> None:
         effective_max_docs,
     )
 
-    ensure_collection()
-
     try:
-        documents = load_documents(effective_query, effective_max_docs)
+        if drop_legacy_points:
+            logger.info("Deleted %s legacy points", delete_legacy_points())
+        summary = run_ingestion(
+            effective_query,
+            effective_max_docs,
+            full_text=full_text,
+            pdf_dir=pdf_dir,
+            incremental=incremental,
+            full_refresh=full_refresh,
+            resume=resume,
+        )
     except Exception as exc:  # noqa: BLE001
-        logger.exception("Failed to load documents: %s", exc)
+        logger.exception("Failed to ingest documents: %s", exc)
         raise typer.Exit(code=1) from exc
 
-    if not documents:
-        logger.warning("No documents found for query '%s'", effective_query)
+    if not summary["fetched"]:
+        if summary.get("since"):
+            logger.info(
+                "No papers submitted since %s for query '%s'", summary["since"], effective_query
+            )
+        else:
+            logger.warning("No documents found for query '%s'", effective_query)
         raise typer.Exit(code=0)
 
-    count = upsert_documents(documents)
-    logger.info("Ingested %s documents into Qdrant", count)
+    logger.info("Ingested %s documents into Qdrant", summary["ingested"])
 
     logger.info("Ingestion completed successfully")
 
 
+def read_queries(path: Path) -> list[str]:
+    """Read one query per line, ignoring blank lines and ``#`` comments."""
+
+    lines = path.read_text(encoding="utf-8").splitlines()
+    return [line.strip() for line in lines if line.strip() and not line.lstrip().startswith("#")]
+
+
+def split_categories(values: list[str]) -> list[str]:
+    """Flatten repeatable, comma-separated ``--category`` values."""
+
+    return [category.strip() for value in values for category in value.split(",") if category.strip()]
+
+
+def category_queries(categories: list[str]) -> list[str]:
+    """Turn ``cs.CL,cs.LG``-style category lists into one ``cat:`` query each."""
+
+    return [f"cat:{category}" for category in split_categories(categories)]
+
+
+def _print_bulk_summary(summary: dict) -> None:
+    table = Table(title="Bulk ingestion")
+    table.add_column("Query")
+    table.add_column("Fetched", justify="right")
+    table.add_column("Unique", justify="right")
+    table.add_column("Duplicates", justify="right")
+    table.add_column("Error")
+    for query, stats in summary["queries"].items():
+        table.add_row(
+            query,
+            str(stats["fetched"]),
+            str(stats["unique"]),
+            str(stats["duplicates"]),
+            stats["error"] or "",
+        )
+    table.add_section()
+    table.add_row(
+        "total",
+        str(summary["fetched"]),
+        str(summary["unique"]),
+        str(summary["duplicates"]),
+        f"{summary['failed_queries']} failed" if summary["failed_queries"] else "",
+    )
+
+    console = Console()
+    console.print(table)
+    console.print(
+        f"{summary['ingested']} chunks from {summary['unique']} papers in "
+        f"{summary['seconds']:.1f}s ({summary['docs_per_sec']:.2f} papers/sec)"
+    )
+
+
+@bulk_app.command()
+def bulk(
+    queries_file: Path | None = typer.Argument(
+        None, exists=True, dir_okay=False, help="File with one arXiv query per line"
+    ),
+    category: list[str] = typer.Option(
+        [], "--category", "-c", help="arXiv categories to ingest (repeatable, comma-separated)"
+    ),
+    max_docs: int | None = typer.Option(None, help="Maximum documents per query"),
+    full_text: bool = typer.Option(False, help="Ingest PDF full text instead of abstracts"),
+    concurrency: int | None = typer.Option(None, help="Queries fetched in parallel"),
+) -> None:
+    """Fetch several queries concurrently and ingest each paper once."""
+
+    settings = get_settings()
+    logger = configure_logging()
+
+    queries = (read_queries(queries_file) if queries_file else []) + category_queries(category)
+    if not queries:
+        logger.error("No queries given; pass a queries file and/or --category")
+        raise typer.Exit(code=2)
+
+    try:
+        summary = run_bulk_ingestion(
+            queries,
+            max_docs or settings.arxiv_max_docs,
+            full_text=full_text,
+            concurrency=concurrency,
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Bulk ingestion failed: %s", exc)
+        raise typer.Exit(code=1) from exc
+
+    _print_bulk_summary(summary)
+    if summary["failed_queries"]:
+        raise typer.Exit(code=1)
+
+
+@snapshot_app.command()
+def snapshot(
+    path: Path = typer.Argument(
+        ..., exists=True, dir_okay=False, help="arXiv metadata snapshot (.json/.jsonl, optionally .gz)"
+    ),
+    category: list[str] = typer.Option(
+        [], "--category", "-c", help="Categories or archives to keep (repeatable, comma-separated)"
+    ),
+    since: str | None = typer.Option(None, help="Keep papers submitted on or after this date (YYYY-MM-DD)"),
+    until: str | None = typer.Option(None, help="Keep papers submitted before this date (YYYY-MM-DD)"),
+    max_docs: int | None = typer.Option(None, help="Stop after this many matching papers"),
+) -> None:
+    """Stream a snapshot file through chunking, embedding and upsert."""
+
+    logger = configure_logging()
+    try:
+        summary = run_snapshot_ingestion(
+            str(path), split_categories(category), since=since, until=until, max_docs=max_docs
+        )
+    except Exception as exc:  # noqa: BLE001
+        logger.exception("Snapshot ingestion failed: %s", exc)
+        raise typer.Exit(code=1) from exc
+
+    if not summary["fetched"]:
+        logger.warning("No snapshot records matched the given filters")
+        raise typer.Exit(code=0)
+
+    Console().print(
+        f"{summary['ingested']} chunks from {summary['fetched']} papers "
+        f"({summary['scanned']} records scanned) in {summary['seconds']:.1f}s "
+        f"({summary['docs_per_sec']:.2f} papers/sec)"
+    )
+
+
 def main() -> None:
     """Entry point for Typer CLI."""
 
@@ -55,5 +215,19 @@ def main() -> None:
     app()
 
 
+def bulk_main() -> None:
+    """Entry point for the bulk ingestion CLI."""
+
+    configure_logging(level=logging.INFO)
+    bulk_app()
+
+
+def snapshot_main() -> None:
+    """Entry point for the snapshot ingestion CLI."""
+
+    configure_logging(level=logging.INFO)
+    snapshot_app()
+
+
 if __name__ == "__main__":
     main()
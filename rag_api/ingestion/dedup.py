@@ -0,0 +1,291 @@
+"""Near-duplicate chunk filtering with MinHash signatures and LSH banding.
+
+Cross-listed papers and v1/v2 revisions produce chunks that are almost
+identical, which waste embedding calls and crowd each other out of the top
+search results. Every chunk gets a MinHash signature over its word
+shingles; the signature is split into bands and each band is hashed into
+an LSH bucket. Chunks sharing a bucket with an earlier chunk are compared
+on their full signatures, and those whose estimated Jaccard similarity
+reaches ``near_dedup_threshold`` are dropped before embedding.
+
+Signatures and buckets are persisted per collection in the ingestion state
+database, so duplicates are caught across runs as well as within one. A new
+chunk's signature is only held in memory (still catching duplicates within
+the run) until :meth:`NearDuplicateIndex.commit` is called once its point is
+in Qdrant; signatures of a failed run are discarded, so later runs never
+drop chunks as duplicates of points that were never written.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import logging
+import re
+import sqlite3
+import threading
+import zlib
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterable, Iterator
+
+import numpy as np
+from langchain_core.documents import Document
+
+from rag_api.ingestion.metrics import StageCounter
+from rag_api.ingestion.store import point_id
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_WORD = re.compile(r"\w+")
+SHINGLE_SIZE = 3
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS minhash_signatures (
+    collection TEXT NOT NULL,
+    point_id TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    PRIMARY KEY (collection, point_id)
+);
+CREATE TABLE IF NOT EXISTS minhash_buckets (
+    collection TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    point_id TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS minhash_buckets_lookup ON minhash_buckets (collection, bucket);
+CREATE INDEX IF NOT EXISTS minhash_buckets_point ON minhash_buckets (collection, point_id);
+CREATE TABLE IF NOT EXISTS near_duplicates (
+    collection TEXT NOT NULL,
+    point_id TEXT NOT NULL,
+    duplicate_of TEXT NOT NULL,
+    similarity REAL NOT NULL,
+    PRIMARY KEY (collection, point_id)
+);
+"""
+
+
+# Probability that a pair exactly at the threshold becomes an LSH candidate.
+LSH_RECALL = 0.95
+
+
+def lsh_bands(num_perm: int, threshold: float, recall: float = LSH_RECALL) -> tuple[int, int]:
+    """Pick ``(bands, rows)`` with ``bands * rows == num_perm`` for ``threshold``.
+
+    Two signatures with Jaccard similarity ``s`` become candidates with
+    probability ``1 - (1 - s**r)**b``. The most rows per band (fewest
+    spurious candidates) are chosen that still make a pair at ``threshold``
+    a candidate with probability ``recall``, which puts the S-curve's
+    midpoint below the threshold; candidates are then checked against the
+    full-signature similarity estimate.
+    """
+
+    options = [(num_perm // rows, rows) for rows in range(1, num_perm + 1) if num_perm % rows == 0]
+    eligible = [
+        (bands, rows) for bands, rows in options if 1 - (1 - threshold**rows) ** bands >= recall
+    ]
+    return max(eligible, key=lambda option: option[1]) if eligible else options[0]
+
+
+class MinHasher:
+    """Compute fixed-seed MinHash signatures so they stay comparable across runs."""
+
+    def __init__(self, num_perm: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        # Coefficients below 2**31 keep a * h + b (h < 2**32) inside uint64.
+        self._a = rng.integers(1, 1 << 31, size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, 1 << 31, size=num_perm, dtype=np.uint64)
+        self.num_perm = num_perm
+
+    @staticmethod
+    def shingles(text: str) -> set[bytes]:
+        words = _WORD.findall(text.lower())
+        if len(words) <= SHINGLE_SIZE:
+            return {" ".join(words).encode("utf-8")} if words else set()
+        return {
+            " ".join(words[index : index + SHINGLE_SIZE]).encode("utf-8")
+            for index in range(len(words) - SHINGLE_SIZE + 1)
+        }
+
+    def signature(self, text: str) -> np.ndarray | None:
+        shingles = self.shingles(text)
+        if not shingles:
+            return None
+        hashes = np.fromiter((zlib.crc32(shingle) for shingle in shingles), dtype=np.uint64)
+        permuted = (np.outer(hashes, self._a) + self._b) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=0).astype(np.uint32)
+
+
+class NearDuplicateIndex:
+    """Persistent MinHash LSH index over the chunks of one collection."""
+
+    def __init__(self, path: str | Path, collection: str, threshold: float, num_perm: int) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.collection = collection
+        self.threshold = threshold
+        self.hasher = MinHasher(num_perm)
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+        # Signatures of chunks admitted but not yet stored in Qdrant.
+        self._pending: dict[str, tuple[np.ndarray, list[int]]] = {}
+        self._pending_buckets: dict[int, set[str]] = {}
+
+    def _buckets(self, signature: np.ndarray) -> list[int]:
+        buckets = []
+        for band in range(self.bands):
+            rows = signature[band * self.rows : (band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(band.to_bytes(2, "little") + rows, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "little", signed=True))
+        return buckets
+
+    def _best_match(
+        self, key: str, signature: np.ndarray, buckets: list[int]
+    ) -> tuple[str, float] | None:
+        placeholders = ",".join("?" * len(buckets))
+        rows = self._conn.execute(
+            "SELECT DISTINCT s.point_id, s.signature FROM minhash_buckets b "
+            "JOIN minhash_signatures s ON s.collection = b.collection AND s.point_id = b.point_id "
+            f"WHERE b.collection = ? AND b.bucket IN ({placeholders}) AND b.point_id != ?",
+            (self.collection, *buckets, key),
+        ).fetchall()
+        candidates = [(candidate, np.frombuffer(blob, dtype=np.uint32)) for candidate, blob in rows]
+        pending = set().union(*(self._pending_buckets.get(bucket, ()) for bucket in buckets))
+        pending.discard(key)
+        candidates.extend((candidate, self._pending[candidate][0]) for candidate in pending)
+
+        best: tuple[str, float] | None = None
+        for candidate, other in candidates:
+            similarity = float(np.mean(other == signature))
+            if similarity >= self.threshold and (best is None or similarity > best[1]):
+                best = (candidate, similarity)
+        return best
+
+    def _stored_signature(self, key: str) -> bytes | None:
+        row = self._conn.execute(
+            "SELECT signature FROM minhash_signatures WHERE collection = ? AND point_id = ?",
+            (self.collection, key),
+        ).fetchone()
+        return row[0] if row else None
+
+    def check_and_add(self, key: str, text: str) -> tuple[str, float] | None:
+        """Return ``(point_id, similarity)`` of an earlier near-duplicate, else admit ``text``.
+
+        An admitted chunk's signature is pending: later chunks are checked
+        against it, but it is only persisted by :meth:`commit`. Re-checking a
+        chunk that is already indexed under ``key`` is not a duplicate.
+        """
+
+        signature = self.hasher.signature(text)
+        if signature is None:
+            return None
+        buckets = self._buckets(signature)
+        with self._lock:
+            match = self._best_match(key, signature, buckets)
+            if match is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO near_duplicates VALUES (?, ?, ?, ?)",
+                    (self.collection, key, match[0], match[1]),
+                )
+                self._conn.commit()
+            elif self._stored_signature(key) != signature.tobytes():
+                self._unpend(key)
+                self._pending[key] = (signature, buckets)
+                for bucket in buckets:
+                    self._pending_buckets.setdefault(bucket, set()).add(key)
+        return match
+
+    def _unpend(self, key: str) -> tuple[np.ndarray, list[int]] | None:
+        entry = self._pending.pop(key, None)
+        if entry is not None:
+            for bucket in entry[1]:
+                keys = self._pending_buckets.get(bucket)
+                if keys is not None:
+                    keys.discard(key)
+                    if not keys:
+                        del self._pending_buckets[bucket]
+        return entry
+
+    def commit(self, keys: Iterable[str]) -> None:
+        """Persist the pending signatures of ``keys``, whose points are now stored."""
+
+        with self._lock:
+            entries = [(key, entry) for key in keys if (entry := self._unpend(key)) is not None]
+            if not entries:
+                return
+            for key, (signature, buckets) in entries:
+                self._conn.execute(
+                    "DELETE FROM minhash_buckets WHERE collection = ? AND point_id = ?",
+                    (self.collection, key),
+                )
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO minhash_signatures VALUES (?, ?, ?)",
+                    (self.collection, key, signature.tobytes()),
+                )
+                self._conn.executemany(
+                    "INSERT INTO minhash_buckets VALUES (?, ?, ?)",
+                    [(self.collection, bucket, key) for bucket in buckets],
+                )
+            self._conn.commit()
+
+    def discard(self, keys: Iterable[str]) -> None:
+        """Forget pending signatures of ``keys`` whose points were never stored."""
+
+        with self._lock:
+            for key in keys:
+                self._unpend(key)
+
+    def clear(self) -> None:
+        """Forget every signature for this collection (e.g. after recreating it)."""
+
+        with self._lock:
+            for table in ("minhash_signatures", "minhash_buckets", "near_duplicates"):
+                self._conn.execute(f"DELETE FROM {table} WHERE collection = ?", (self.collection,))
+            self._conn.commit()
+            self._pending.clear()
+            self._pending_buckets.clear()
+
+
+@lru_cache
+def get_near_duplicate_index() -> NearDuplicateIndex | None:
+    """Return the index for the configured collection, or None when disabled."""
+
+    settings = get_settings()
+    if not settings.near_dedup_enabled:
+        return None
+    return NearDuplicateIndex(
+        settings.ingestion_state_path,
+        settings.qdrant_collection,
+        settings.near_dedup_threshold,
+        settings.near_dedup_num_perm,
+    )
+
+
+def drop_near_duplicates(
+    documents: Iterable[Document],
+    index: NearDuplicateIndex,
+    counter: StageCounter | None = None,
+) -> Iterator[Document]:
+    """Yield documents that are not near-duplicates of an already indexed chunk.
+
+    Yielded documents are pending in ``index`` until committed or discarded.
+    """
+
+    for document in documents:
+        match = index.check_and_add(point_id(document), document.page_content)
+        if match is None:
+            yield document
+            continue
+        if counter is not None:
+            counter.add()
+        LOGGER.debug(
+            "Dropping near-duplicate %s (%.2f similar to %s)",
+            document.metadata.get("arxiv_id"),
+            match[1],
+            match[0],
+        )
@@ -0,0 +1,231 @@
+"""Full-text PDF extraction for ingestion.
+
+PDFs are downloaded on a bounded thread pool over the process-wide
+keep-alive session, and text extraction runs in a process pool so CPU-bound
+parsing uses every core. Both stages keep a bounded number of items in flight
+and yield documents in input order, so they can sit between a streaming source
+and ``upsert_documents`` without buffering the corpus.
+"""
+
+from __future__ import annotations
+
+import logging
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
+
+import requests
+from langchain_core.documents import Document
+from tenacity import retry, stop_after_attempt, wait_exponential
+
+from rag_api.clients.arxiv import is_arxiv_id, split_arxiv_id
+from rag_api.clients.http import get_http_session
+from rag_api.clients.ratelimit import get_arxiv_pdf_rate_limiter
+from rag_api.ingestion.metrics import StageCounter
+from rag_api.settings import get_settings
+
+LOGGER = logging.getLogger(__name__)
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+def _bounded_map(
+    executor: Executor, fn: Callable[[T], R], items: Iterable[T], max_pending: int
+) -> Iterator[tuple[T, Future]]:
+    """Submit ``fn(item)`` lazily, keeping at most ``max_pending`` futures in flight.
+
+    Yields ``(item, future)`` pairs in submission order.
+    """
+
+    pending: deque[tuple[T, Future]] = deque()
+    for item in items:
+        pending.append((item, executor.submit(fn, item)))
+        if len(pending) >= max_pending:
+            yield pending.popleft()
+    while pending:
+        yield pending.popleft()
+
+
+def extract_pdf_text(source: bytes | str) -> str:
+    """Extract plain text from PDF bytes or a PDF path (runs in worker processes)."""
+
+    import fitz
+
+    if isinstance(source, bytes):
+        document = fitz.open(stream=source, filetype="pdf")
+    else:
+        document = fitz.open(source)
+    with document:
+        return "\n".join(page.get_text() for page in document).strip()
+
+
+def _pdf_url(document: Document) -> str | None:
+    url = document.metadata.get("pdf_url")
+    if url:
+        # The Atom feed advertises plain-http PDF links; arXiv redirects them.
+        return url.replace("http://arxiv.org/", "https://arxiv.org/", 1)
+    arxiv_id = document.metadata.get("arxiv_id")
+    return f"https://arxiv.org/pdf/{arxiv_id}" if arxiv_id else None
+
+
+def _with_text(document: Document, text: str) -> Document:
+    return Document(
+        page_content=text,
+        metadata={**document.metadata, "content_type": "full_text"},
+    )
+
+
+def _worker_count(configured: int | None) -> int:
+    return max(configured or os.cpu_count() or 1, 1)
+
+
+def _parse_pool(workers: int) -> ProcessPoolExecutor:
+    # The pool is started from pipeline worker threads; spawned children do
+    # not inherit locks held by other threads the way forked ones would.
+    return ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context("spawn"))
+
+
+def with_full_text(
+    documents: Iterable[Document],
+    counters: dict[str, StageCounter] | None = None,
+) -> Iterator[Document]:
+    """Replace each document's abstract with the text of its PDF.
+
+    Documents whose PDF cannot be downloaded or parsed are passed through with
+    their abstract so a bad PDF never drops a paper.
+    """
+
+    settings = get_settings()
+    concurrency = max(settings.fulltext_download_concurrency, 1)
+    workers = _worker_count(settings.fulltext_parse_workers)
+    counters = counters if counters is not None else {}
+    download_counter = counters.setdefault("download", StageCounter("download"))
+    parse_counter = counters.setdefault("parse", StageCounter("parse"))
+    yield from _download_and_parse(
+        documents, get_http_session(), concurrency, workers, download_counter, parse_counter
+    )
+
+
+def _download_and_parse(
+    documents: Iterable[Document],
+    session: requests.Session,
+    concurrency: int,
+    workers: int,
+    download_counter: StageCounter,
+    parse_counter: StageCounter,
+) -> Iterator[Document]:
+    timeout = get_settings().fulltext_download_timeout
+    limiter = get_arxiv_pdf_rate_limiter()
+
+    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+    def fetch(url: str) -> bytes:
+        # Every attempt, retries included, takes a token.
+        limiter.acquire()
+        response = session.get(url, timeout=timeout)
+        response.raise_for_status()
+        return response.content
+
+    def download(document: Document) -> bytes | None:
+        url = _pdf_url(document)
+        if url is None:
+            return None
+        try:
+            payload = fetch(url)
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.warning("Failed to download PDF %s: %s", url, exc)
+            download_counter.add(failed=True)
+            return None
+        download_counter.add(nbytes=len(payload))
+        return payload
+
+    with (
+        ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="pdf-download") as io_pool,
+        _parse_pool(workers) as cpu_pool,
+    ):
+        downloaded = (
+            (document, future.result())
+            for document, future in _bounded_map(io_pool, download, documents, concurrency * 2)
+        )
+
+        pending: deque[tuple[Document, Future | None]] = deque()
+        for document, payload in downloaded:
+            future = cpu_pool.submit(extract_pdf_text, payload) if payload else None
+            pending.append((document, future))
+            if len(pending) >= workers * 2:
+                yield _finish_parse(*pending.popleft(), parse_counter)
+        while pending:
+            yield _finish_parse(*pending.popleft(), parse_counter)
+
+
+def _finish_parse(document: Document, future: Future | None, counter: StageCounter) -> Document:
+    if future is None:
+        return document
+    try:
+        text = future.result()
+    except Exception as exc:  # noqa: BLE001
+        LOGGER.warning("Failed to parse PDF for %s: %s", document.metadata.get("arxiv_id"), exc)
+        counter.add(failed=True)
+        return document
+    if not text:
+        counter.add(failed=True)
+        return document
+    counter.add(nbytes=len(text.encode("utf-8")))
+    return _with_text(document, text)
+
+
+def _document_for_path(path: Path) -> Document:
+    # Files named after their arXiv ID get its metadata; old-style IDs use
+    # "_" in place of "/" (hep-th_9901001v1.pdf). Any other PDF is stored as
+    # "unknown", keyed on its content, with a file:// source.
+    arxiv_id = path.stem.replace("_", "/", 1)
+    if not is_arxiv_id(arxiv_id):
+        return Document(
+            page_content="",
+            metadata={
+                "title": path.stem,
+                "arxiv_id": "unknown",
+                "source": path.resolve().as_uri(),
+                "content_type": "full_text",
+            },
+        )
+    paper_id, version = split_arxiv_id(arxiv_id)
+    return Document(
+        page_content="",
+        metadata={
+            "title": path.stem,
+            "arxiv_id": arxiv_id,
+            "paper_id": paper_id,
+            "version": version,
+            "source": f"https://arxiv.org/abs/{arxiv_id}",
+            "content_type": "full_text",
+        },
+    )
+
+
+def iter_local_pdfs(
+    directory: str | Path,
+    max_docs: int | None = None,
+    counters: dict[str, StageCounter] | None = None,
+) -> Iterator[Document]:
+    """Yield full-text documents for ``*.pdf`` files in ``directory`` (offline source)."""
+
+    settings = get_settings()
+    workers = _worker_count(settings.fulltext_parse_workers)
+    counters = counters if counters is not None else {}
+    parse_counter = counters.setdefault("parse", StageCounter("parse"))
+
+    paths = sorted(Path(directory).expanduser().glob("*.pdf"))
+    if max_docs is not None:
+        paths = paths[:max_docs]
+
+    with _parse_pool(workers) as cpu_pool:
+        for path, future in _bounded_map(cpu_pool, extract_pdf_text, map(str, paths), workers * 2):
+            document = _finish_parse(_document_for_path(Path(path)), future, parse_counter)
+            if document.page_content:
+                yield document
+            else:
+                LOGGER.warning("No text extracted from %s", path)
@@ -0,0 +1,48 @@
+"""Throughput counters for ingestion stages."""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any
+
+
+@dataclass
+class StageCounter:
+    """Thread-safe item/byte counter for one pipeline stage."""
+
+    name: str
+    items: int = 0
+    failures: int = 0
+    bytes: int = 0
+    started: float = field(default_factory=time.perf_counter)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False, compare=False)
+
+    def add(self, items: int = 1, nbytes: int = 0, failed: bool = False) -> None:
+        with self._lock:
+            if failed:
+                self.failures += items
+            else:
+                self.items += items
+            self.bytes += nbytes
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rate(self) -> float:
+        """Items per second since the counter was created."""
+
+        elapsed = self.elapsed
+        return self.items / elapsed if elapsed > 0 else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "items": self.items,
+            "failures": self.failures,
+            "bytes": self.bytes,
+            "seconds": round(self.elapsed, 3),
+            "per_sec": round(self.rate, 2),
+        }
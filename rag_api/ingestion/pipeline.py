@@ -3,36 +3,604 @@
 from __future__ import annotations
 
 import logging
-from typing import Iterable
+import queue
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, Sequence
 
 from langchain_core.documents import Document
+from langchain_core.embeddings import Embeddings
 
-from rag_api.ingestion.arxiv import load_documents
-from rag_api.ingestion.store import ensure_collection, upsert_documents
+from rag_api.ingestion.arxiv import iter_documents
+from rag_api.ingestion.chunking import chunk_documents
+from rag_api.ingestion.dedup import drop_near_duplicates, get_near_duplicate_index
+from rag_api.ingestion.fulltext import iter_local_pdfs, with_full_text
+from rag_api.ingestion.metrics import StageCounter
+from rag_api.ingestion.snapshot import iter_snapshot
+from rag_api.ingestion.state import IngestionState, RunManifest, get_ingestion_state
+from rag_api.ingestion.stages import StagedPipeline
+from rag_api.ingestion.store import batched, embed_batch, ensure_collection, point_id, write_points
+from rag_api.settings import get_settings
 
 LOGGER = logging.getLogger(__name__)
 
 
-def _ensure_iterable(documents: Iterable[Document] | None) -> list[Document]:
-    if not documents:
-        return []
-    if isinstance(documents, list):
-        return documents
-    return list(documents)
+class IngestionCancelled(RuntimeError):
+    """Raised inside a run whose ``cancel`` event was set."""
 
 
-def run_ingestion(query: str, max_docs: int) -> dict[str, int | str]:
-    """Execute the ingestion flow and return summary metadata."""
+def _until_cancelled(documents: Iterable[Document], cancel: threading.Event | None) -> Iterator[Document]:
+    """Pass documents through until ``cancel`` is set, then fail the run."""
 
+    for document in documents:
+        if cancel is not None and cancel.is_set():
+            raise IngestionCancelled("Ingestion cancelled")
+        yield document
+
+
+def _count(documents: Iterable[Document], counter: StageCounter) -> Iterator[Document]:
+    """Pass documents through while counting them."""
+
+    for document in documents:
+        counter.add()
+        yield document
+
+
+def _track_newest(documents: Iterable[Document], newest: dict[str, str | None]) -> Iterator[Document]:
+    """Pass documents through while recording the newest ``published`` timestamp."""
+
+    for document in documents:
+        published = document.metadata.get("published")
+        if published and (newest["published"] is None or published > newest["published"]):
+            newest["published"] = published
+        yield document
+
+
+class _CommitTracker:
+    """Track the contiguous prefix of source documents whose chunks are all settled.
+
+    A chunk is settled once its point is written, found already stored, or
+    dropped as a near-duplicate. Documents are registered in source order;
+    ``on_commit`` receives the new prefix length each time it grows.
+    """
+
+    def __init__(self, on_commit: Callable[[int], None]) -> None:
+        self._on_commit = on_commit
+        self._lock = threading.Lock()
+        self._notify_lock = threading.Lock()
+        self._registered = 0
+        self._committed = 0
+        self._reported = 0
+        self._outstanding: dict[int, int] = {}
+        self._owners: defaultdict[str, deque[int]] = defaultdict(deque)
+
+    def register(self, keys: list[str]) -> None:
+        """Register the next source document with the point IDs of its chunks."""
+
+        with self._lock:
+            sequence = self._registered
+            self._registered += 1
+            self._outstanding[sequence] = len(keys)
+            for key in keys:
+                self._owners[key].append(sequence)
+            self._advance()
+        self._notify()
+
+    def settle(self, keys: Iterable[str]) -> None:
+        """Mark one chunk per key as stored or dropped."""
+
+        with self._lock:
+            for key in keys:
+                # A paper listed twice shares point IDs; releasing the latest
+                # owner first keeps the earliest one open until every copy
+                # has settled.
+                owners = self._owners[key]
+                self._outstanding[owners.pop()] -= 1
+                if not owners:
+                    del self._owners[key]
+            self._advance()
+        self._notify()
+
+    def _advance(self) -> None:
+        while self._outstanding.get(self._committed) == 0:
+            del self._outstanding[self._committed]
+            self._committed += 1
+
+    def _notify(self) -> None:
+        # Serialised so the callback sees a non-decreasing prefix.
+        with self._notify_lock:
+            with self._lock:
+                committed = self._committed
+            if committed > self._reported:
+                self._reported = committed
+                self._on_commit(committed)
+
+
+def store_documents(
+    documents: Iterable[Document],
+    counters: dict[str, StageCounter] | None = None,
+    full_text: bool = False,
+    embeddings: Embeddings | None = None,
+    on_commit: Callable[[int], None] | None = None,
+) -> int:
+    """Run ``documents`` through the staged parse/chunk/embed/upsert pipeline.
+
+    Stages run concurrently, each on its own workers, and are connected by
+    queues holding at most ``ingestion_queue_batches`` batches, so the
+    slowest stage sets the pace and memory stays bounded:
+
+    - ``fetch``: pulls ``documents`` (API pages, snapshot lines, ...);
+    - ``parse``: with ``full_text``, swaps abstracts for PDF text (download
+      threads, parse processes);
+    - ``chunk``: token-bounded chunks (one thread), then near-duplicate
+      filtering;
+    - ``embed``: skips unchanged points and embeds the rest, per batch;
+    - ``upsert``: writes the points to Qdrant.
+
+    Near-duplicate signatures of admitted chunks are committed once their
+    points are written (or found already stored) and discarded if the run
+    fails. ``on_commit`` is called with the number of leading ``documents``
+    whose chunks are all stored (or skipped), as that number grows. Returns
+    the number of points written.
+    """
+
+    settings = get_settings()
+    counters = counters if counters is not None else {}
+    for name in ("skip", "embed", "upsert"):
+        counters.setdefault(name, StageCounter(name))
+    batch_size = max(settings.ingestion_batch_size, 1)
+    depth = max(settings.ingestion_queue_batches, 1)
+
+    pipeline = StagedPipeline().source("fetch", documents, maxsize=depth * batch_size)
+    if full_text:
+        pipeline.stream(
+            "parse", lambda items: with_full_text(items, counters=counters), maxsize=depth * batch_size
+        )
+    tracker = _CommitTracker(on_commit) if on_commit is not None else None
+
+    def track(items: Iterable[Document]) -> Iterator[Document]:
+        # Everything up to here runs on one thread per stage, so documents
+        # arrive in source order.
+        for document in items:
+            chunks = list(chunk_documents([document])) if settings.chunking_enabled else [document]
+            tracker.register([point_id(chunk) for chunk in chunks])
+            yield from chunks
+
+    if tracker is not None:
+        pipeline.stream("chunk", track, maxsize=depth * batch_size)
+    elif settings.chunking_enabled:
+        # One thread: tokenizing abstracts is GIL-bound, so more workers only
+        # add queue hops.
+        pipeline.stream("chunk", chunk_documents, maxsize=depth * batch_size)
+    index = get_near_duplicate_index()
+    admitted: set[str] = set()
+
+    def admit(document: Document) -> Iterator[Document]:
+        kept = next(iter(drop_near_duplicates([document], index, counter)), None)
+        if kept is None:
+            if tracker is not None:
+                tracker.settle([point_id(document)])
+            return
+        admitted.add(point_id(kept))
+        yield kept
+
+    def embed(batch: list[Document]) -> list[list]:
+        points = embed_batch(batch, embeddings, counters)
+        # Chunks skipped as unchanged are already stored under their IDs.
+        pending = Counter(str(point.id) for point in points)
+        skipped = []
+        for key in map(point_id, batch):
+            if pending[key]:
+                pending[key] -= 1
+            else:
+                skipped.append(key)
+        if index is not None:
+            index.commit(skipped)
+        if tracker is not None:
+            tracker.settle(skipped)
+        return [points]
+
+    def upsert(points: list) -> list[int]:
+        if not points:
+            return []
+        count = write_points(points, counters)
+        keys = [str(point.id) for point in points]
+        if index is not None:
+            index.commit(keys)
+        if tracker is not None:
+            tracker.settle(keys)
+        return [count]
+
+    if index is not None:
+        counter = counters.setdefault("near_duplicate", StageCounter("near_duplicate"))
+        pipeline.map("near_duplicate", admit, workers=1, maxsize=depth * batch_size)
+    pipeline.stream("batch", lambda items: batched(items, batch_size), maxsize=depth)
+    pipeline.map("embed", embed, workers=settings.ingestion_embed_workers, maxsize=depth)
+    pipeline.map("upsert", upsert, workers=settings.ingestion_upsert_workers, maxsize=depth)
+    try:
+        return sum(pipeline.results())
+    finally:
+        if index is not None:
+            # Whatever is still pending never reached Qdrant.
+            index.discard(admitted)
+
+
+def _log_stages(stages: dict[str, dict[str, Any]]) -> None:
+    for name, stats in stages.items():
+        LOGGER.info(
+            "Stage %s: %s ok, %s failed, %.1f items/sec",
+            name,
+            stats["items"],
+            stats["failures"],
+            stats["per_sec"],
+        )
+
+
+def _store_checkpointed(
+    source: Iterable[Document],
+    counters: dict[str, StageCounter],
+    full_text: bool,
+    state: IngestionState,
+    run: RunManifest,
+    newest: dict[str, str | None],
+) -> int:
+    """Store ``source`` through one pipeline, checkpointing as papers are stored.
+
+    The run's cursor advances every ``ingestion_checkpoint_docs`` papers of
+    the contiguous prefix of ``source`` whose points are all in Qdrant, so a
+    checkpoint never covers a paper still in flight and the stages never
+    drain between checkpoints. Returns the number of points written.
+    """
+
+    segment = get_settings().ingestion_checkpoint_docs
+    upsert_counter = counters.setdefault("upsert", StageCounter("upsert"))
+    written_before = upsert_counter.items
+    checkpointed = [0]
+
+    def checkpoint(committed: int) -> None:
+        cursor = run.cursor + committed
+        ingested = run.ingested + upsert_counter.items - written_before
+        state.checkpoint(run.run_id, cursor, ingested, newest["published"])
+        checkpointed[0] = committed
+        LOGGER.info("Run %s: checkpoint at result %s (%s chunks stored)", run.run_id, cursor, ingested)
+
+    def on_commit(committed: int) -> None:
+        if segment > 0 and committed - checkpointed[0] >= segment:
+            checkpoint(committed)
+
+    fetch_counter = counters["fetch"]
+    fetched_before = fetch_counter.items
+    count = store_documents(source, counters, full_text=full_text, on_commit=on_commit)
+    # Every fetched paper is now stored or skipped.
+    consumed = fetch_counter.items - fetched_before
+    if consumed > checkpointed[0]:
+        checkpoint(consumed)
+    return count
+
+
+def run_ingestion(
+    query: str,
+    max_docs: int,
+    full_text: bool = False,
+    pdf_dir: str | None = None,
+    counters: dict[str, StageCounter] | None = None,
+    incremental: bool | None = None,
+    full_refresh: bool = False,
+    resume: bool = False,
+    cancel: threading.Event | None = None,
+) -> dict[str, Any]:
+    """Execute the ingestion flow and return summary metadata.
+
+    Documents are streamed page by page from arXiv through the staged
+    pipeline of :func:`store_documents`, so memory use does not grow with
+    ``max_docs``. With ``full_text`` each paper's PDF replaces its abstract;
+    ``pdf_dir`` reads full text from a local directory of PDFs instead of
+    calling arXiv at all.
+
+    Documents are split into token-bounded chunks (see
+    :mod:`rag_api.ingestion.chunking`) before embedding, so ``ingested``
+    counts chunks while ``fetched`` counts papers.
+
+    In incremental mode (opt-in, ``incremental_ingestion`` by default)
+    results are fetched newest first instead of by relevance, and paging
+    stops at the query's high-water mark, the newest submission date ingested
+    by a previous successful run. The mark is advanced once this run has been
+    stored, unless ``max_docs`` ran out before paging got back to the old
+    mark: the papers in between were never fetched, so the mark stays put.
+    ``full_refresh`` ignores the stored mark for one run.
+
+    Every API run records a manifest in the ingestion state and checkpoints
+    its paging cursor every ``ingestion_checkpoint_docs`` papers. ``resume``
+    continues the query's most recent unfinished run from its last
+    checkpoint, with that run's parameters, instead of starting a new one;
+    runs older than the last completed one, and runs still alive in another
+    job or process, are never resumed.
+
+    Pass ``counters`` to observe per-stage progress (``fetch``, ``embed``,
+    ``upsert``, ...) while the run is in flight. Setting ``cancel`` stops the
+    run at the next document with :class:`IngestionCancelled`; its manifest
+    is marked failed, so it can be resumed.
+    """
+
+    settings = get_settings()
+    ensure_collection()
+
+    counters = counters if counters is not None else {}
+    fetch_counter = counters.setdefault("fetch", StageCounter("fetch"))
+    state = None if pdf_dir else get_ingestion_state()
+    run = state.claim_unfinished_run(query) if state and resume else None
+    resumed_from = None
+
+    if run is not None:
+        max_docs = run.params["max_docs"]
+        full_text = run.params["full_text"]
+        incremental = run.params["newest_first"]
+        since = run.params["since"]
+        resumed_from = run.cursor
+        LOGGER.info(
+            "Resuming run %s for query '%s' at result %s (%s chunks already stored)",
+            run.run_id,
+            query,
+            run.cursor,
+            run.ingested,
+        )
+    else:
+        if resume and state:
+            LOGGER.info("No unfinished run to resume for query '%s'; starting a new one", query)
+        incremental = settings.incremental_ingestion if incremental is None else incremental
+        incremental = incremental and not pdf_dir
+        since = state.get_high_water_mark(query) if incremental and not full_refresh else None
+        if state:
+            run = state.start_run(
+                query,
+                {"max_docs": max_docs, "full_text": full_text, "newest_first": incremental, "since": since},
+            )
+
+    if pdf_dir:
+        source = _until_cancelled(iter_local_pdfs(pdf_dir, max_docs, counters=counters), cancel)
+        count = store_documents(_count(source, fetch_counter), counters)
+        fetched = fetch_counter.items
+    else:
+        if since:
+            LOGGER.info("Fetching papers for query '%s' submitted since %s", query, since)
+        newest: dict[str, str | None] = {"published": run.newest_published}
+        progress: dict[str, Any] = {}
+        source = iter_documents(
+            query, max_docs, since=since, newest_first=incremental, start=run.cursor, progress=progress
+        )
+        source = _count(_track_newest(_until_cancelled(source, cancel), newest), fetch_counter)
+        try:
+            with state.lease(run.run_id):
+                count = _store_checkpointed(source, counters, full_text, state, run, newest)
+        except BaseException as exc:
+            state.finish_run(run.run_id, "failed", str(exc) or type(exc).__name__)
+            LOGGER.error("Run %s failed; continue it with resume", run.run_id)
+            raise
+        state.finish_run(run.run_id, "completed")
+        run = state.get_run(run.run_id)
+        fetched = fetch_counter.items
+
+        if incremental and run.newest_published:
+            if since and not progress.get("complete"):
+                LOGGER.warning(
+                    "Query '%s' hit max_docs=%s before reaching its high-water mark %s; "
+                    "papers in between were not fetched, so the mark is left unchanged "
+                    "(raise max_docs or use a full refresh)",
+                    query,
+                    max_docs,
+                    since,
+                )
+            else:
+                state.set_high_water_mark(query, run.newest_published)
+
+    stages = {name: counter.summary() for name, counter in counters.items()}
+    summary = {
+        "ingested": count,
+        "fetched": fetched,
+        "query": query,
+        "stages": stages,
+        "since": since,
+        "high_water_mark": state.get_high_water_mark(query) if state and incremental else None,
+        "run_id": run.run_id if run else None,
+        "resumed_from": resumed_from,
+    }
+    if not fetched:
+        LOGGER.info("No new documents retrieved for query '%s'", query)
+        return summary
+
+    _log_stages(stages)
+    LOGGER.info(
+        "Ingested %s chunks from %s fetched documents for query '%s'", count, fetched, query
+    )
+    return summary
+
+
+def run_snapshot_ingestion(
+    path: str,
+    categories: Sequence[str] = (),
+    since: str | None = None,
+    until: str | None = None,
+    max_docs: int | None = None,
+    counters: dict[str, StageCounter] | None = None,
+) -> dict[str, Any]:
+    """Ingest a local arXiv metadata snapshot (JSON Lines, optionally gzipped).
+
+    The file is streamed line by line through the same chunk/embed/upsert
+    path as API ingestion, so memory stays flat however large the snapshot
+    is, and no network is needed when embeddings run locally (HuggingFace).
+    """
+
+    ensure_collection()
+
+    started = time.perf_counter()
+    counters = counters if counters is not None else {}
+    fetch_counter = counters.setdefault("fetch", StageCounter("fetch"))
+    source = iter_snapshot(
+        path, categories, since=since, until=until, max_docs=max_docs, counters=counters
+    )
+    count = store_documents(_count(source, fetch_counter), counters)
+    seconds = time.perf_counter() - started
+    stages = {name: counter.summary() for name, counter in counters.items()}
+
+    _log_stages(stages)
+    LOGGER.info(
+        "Ingested %s chunks from %s of %s snapshot records in %.1fs",
+        count,
+        fetch_counter.items,
+        counters["scan"].items,
+        seconds,
+    )
+    return {
+        "ingested": count,
+        "fetched": fetch_counter.items,
+        "scanned": counters["scan"].items,
+        "path": str(path),
+        "seconds": round(seconds, 3),
+        "docs_per_sec": round(fetch_counter.items / seconds, 2) if seconds > 0 else 0.0,
+        "stages": stages,
+    }
+
+
+_QUERY_DONE = object()
+
+
+def _fetch_concurrently(
+    queries: Sequence[str],
+    max_docs: int,
+    per_query: dict[str, dict[str, Any]],
+    concurrency: int,
+    fetch_counter: StageCounter,
+) -> Iterator[tuple[str, Document]]:
+    """Yield ``(query, document)`` pairs from several arXiv queries at once.
+
+    Each query pages through the API on its own worker thread; the requests
+    themselves still go through the process-wide arXiv pacing. A bounded queue
+    keeps fast producers from running ahead of embedding.
+    """
+
+    results: queue.Queue = queue.Queue(maxsize=get_settings().ingestion_batch_size * 4)
+    stop = threading.Event()
+
+    def put(item: tuple[str, Any]) -> bool:
+        while not stop.is_set():
+            try:
+                results.put(item, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def produce(query: str) -> None:
+        stats = per_query[query]
+        try:
+            for document in iter_documents(query, max_docs):
+                stats["fetched"] += 1
+                fetch_counter.add()
+                if not put((query, document)):
+                    return
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.exception("Fetching query '%s' failed: %s", query, exc)
+            stats["error"] = str(exc)
+        finally:
+            put((query, _QUERY_DONE))
+
+    executor = ThreadPoolExecutor(max_workers=max(concurrency, 1), thread_name_prefix="bulk-fetch")
+    try:
+        for query in queries:
+            executor.submit(produce, query)
+        remaining = len(queries)
+        while remaining:
+            query, item = results.get()
+            if item is _QUERY_DONE:
+                remaining -= 1
+                continue
+            yield query, item
+    finally:
+        # Unblock producers if the consumer stopped early.
+        stop.set()
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _dedupe(
+    pairs: Iterable[tuple[str, Document]],
+    per_query: dict[str, dict[str, Any]],
+    duplicate_counter: StageCounter,
+) -> Iterator[Document]:
+    """Drop papers already seen under an earlier query, crediting the first query."""
+
+    seen: set[str] = set()
+    for query, document in pairs:
+        key = document.metadata.get("paper_id") or document.metadata.get("arxiv_id")
+        if key and key in seen:
+            per_query[query]["duplicates"] += 1
+            duplicate_counter.add()
+            continue
+        if key:
+            seen.add(key)
+        per_query[query]["unique"] += 1
+        yield document
+
+
+def run_bulk_ingestion(
+    queries: Sequence[str],
+    max_docs: int,
+    full_text: bool = False,
+    concurrency: int | None = None,
+    counters: dict[str, StageCounter] | None = None,
+) -> dict[str, Any]:
+    """Ingest several arXiv queries in one run, embedding each paper once.
+
+    Queries are fetched concurrently (``bulk_fetch_concurrency`` at a time)
+    under the shared arXiv pacing, papers returned by more than one query are
+    dropped before any PDF download or embedding, and everything lands in a
+    single chunk/embed/upsert stream. ``max_docs`` applies per query.
+    """
+
+    settings = get_settings()
+    queries = list(dict.fromkeys(query.strip() for query in queries if query.strip()))
     ensure_collection()
 
-    docs = load_documents(query, max_docs)
-    documents = _ensure_iterable(docs)
+    started = time.perf_counter()
+    counters = counters if counters is not None else {}
+    fetch_counter = counters.setdefault("fetch", StageCounter("fetch"))
+    duplicate_counter = counters.setdefault("duplicate", StageCounter("duplicate"))
+    per_query: dict[str, dict[str, Any]] = {
+        query: {"fetched": 0, "unique": 0, "duplicates": 0, "error": None} for query in queries
+    }
+
+    pairs = _fetch_concurrently(
+        queries, max_docs, per_query, concurrency or settings.bulk_fetch_concurrency, fetch_counter
+    )
+    source = _dedupe(pairs, per_query, duplicate_counter)
 
-    if not documents:
-        LOGGER.info("No documents retrieved for query '%s'", query)
-        return {"ingested": 0, "query": query}
+    try:
+        count = store_documents(source, counters, full_text=full_text)
+    finally:
+        # Stop the fetch workers even when embedding or upsert fails mid-run.
+        pairs.close()
+    seconds = time.perf_counter() - started
+    stages = {name: counter.summary() for name, counter in counters.items()}
+    unique = sum(stats["unique"] for stats in per_query.values())
 
-    count = upsert_documents(documents)
-    LOGGER.info("Ingested %s documents for query '%s'", count, query)
-    return {"ingested": count, "query": query}
+    _log_stages(stages)
+    LOGGER.info(
+        "Bulk ingestion: %s queries, %s fetched, %s duplicates, %s chunks in %.1fs",
+        len(queries),
+        fetch_counter.items,
+        duplicate_counter.items,
+        count,
+        seconds,
+    )
+    return {
+        "ingested": count,
+        "fetched": fetch_counter.items,
+        "unique": unique,
+        "duplicates": duplicate_counter.items,
+        "failed_queries": sum(1 for stats in per_query.values() if stats["error"]),
+        "seconds": round(seconds, 3),
+        "docs_per_sec": round(unique / seconds, 2) if seconds > 0 else 0.0,
+        "queries": per_query,
+        "stages": stages,
+    }
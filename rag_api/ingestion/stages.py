@@ -0,0 +1,153 @@
+"""Bounded-queue stage runner for the ingestion pipeline.
+
+A :class:`StagedPipeline` is a chain of stages, each running on its own
+worker threads and connected to the next by a bounded queue. A stage that
+falls behind fills its input queue, which blocks the stage before it, so the
+slowest stage sets the pace and at most ``maxsize`` items wait between any
+two stages, however large the corpus is.
+
+The first failure in any stage stops every stage and is re-raised from
+:meth:`StagedPipeline.results`.
+"""
+
+from __future__ import annotations
+
+import logging
+import queue
+import threading
+from typing import Any, Callable, Iterable, Iterator
+
+LOGGER = logging.getLogger(__name__)
+
+_DONE = object()
+# How often blocked workers check whether the pipeline was stopped.
+_POLL_SECONDS = 0.1
+
+
+class StagedPipeline:
+    """Stream items through stages connected by bounded queues.
+
+    Build the chain with :meth:`source` followed by any number of
+    :meth:`map` and :meth:`stream` stages, then iterate :meth:`results`.
+    """
+
+    def __init__(self) -> None:
+        self._stop = threading.Event()
+        self._errors: list[BaseException] = []
+        self._threads: list[threading.Thread] = []
+        self._tail: queue.Queue | None = None
+
+    def _put(self, target: queue.Queue, item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL_SECONDS)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _drain(self, inbound: queue.Queue) -> Iterator[Any]:
+        while not self._stop.is_set():
+            try:
+                item = inbound.get(timeout=_POLL_SECONDS)
+            except queue.Empty:
+                continue
+            if item is _DONE:
+                # Leave the marker for sibling workers of the same stage.
+                inbound.put(_DONE)
+                return
+            yield item
+
+    def _start(self, name: str, workers: int, maxsize: int, body: Callable[[queue.Queue], None]) -> None:
+        outbound: queue.Queue = queue.Queue(maxsize=max(maxsize, 1))
+        remaining = [max(workers, 1)]
+        lock = threading.Lock()
+
+        def run() -> None:
+            try:
+                body(outbound)
+            except BaseException as exc:  # noqa: BLE001
+                LOGGER.error("Ingestion stage '%s' failed: %s", name, exc)
+                self._errors.append(exc)
+                self._stop.set()
+            finally:
+                with lock:
+                    remaining[0] -= 1
+                    last = remaining[0] == 0
+                if last:
+                    self._put(outbound, _DONE)
+
+        for index in range(remaining[0]):
+            thread = threading.Thread(target=run, name=f"ingest-{name}-{index}", daemon=True)
+            self._threads.append(thread)
+            thread.start()
+        self._tail = outbound
+
+    def _inbound(self) -> queue.Queue:
+        if self._tail is None:
+            raise RuntimeError("StagedPipeline needs a source() before other stages")
+        return self._tail
+
+    def source(self, name: str, items: Iterable[Any], maxsize: int) -> StagedPipeline:
+        """Feed ``items`` into the pipeline from one thread."""
+
+        def body(outbound: queue.Queue) -> None:
+            iterator = iter(items)
+            try:
+                for item in iterator:
+                    if not self._put(outbound, item):
+                        return
+            finally:
+                close = getattr(iterator, "close", None)
+                if close is not None:
+                    close()
+
+        self._start(name, 1, maxsize, body)
+        return self
+
+    def map(
+        self, name: str, fn: Callable[[Any], Iterable[Any]], workers: int, maxsize: int
+    ) -> StagedPipeline:
+        """Apply ``fn`` to every item on ``workers`` threads; each call yields zero or more outputs.
+
+        Outputs are not kept in input order when ``workers`` is above one.
+        """
+
+        inbound = self._inbound()
+
+        def body(outbound: queue.Queue) -> None:
+            for item in self._drain(inbound):
+                for result in fn(item):
+                    if not self._put(outbound, result):
+                        return
+
+        self._start(name, workers, maxsize, body)
+        return self
+
+    def stream(
+        self, name: str, transform: Callable[[Iterator[Any]], Iterable[Any]], maxsize: int
+    ) -> StagedPipeline:
+        """Run an iterator-to-iterator ``transform`` (batching, ordered pools) on one thread."""
+
+        inbound = self._inbound()
+
+        def body(outbound: queue.Queue) -> None:
+            for result in transform(self._drain(inbound)):
+                if not self._put(outbound, result):
+                    return
+
+        self._start(name, 1, maxsize, body)
+        return self
+
+    def results(self) -> Iterator[Any]:
+        """Yield the last stage's outputs; raise the first stage failure, if any."""
+
+        try:
+            yield from self._drain(self._inbound())
+        finally:
+            # Also reached when the caller stops iterating early.
+            self._stop.set()
+            for thread in self._threads:
+                thread.join()
+        if self._errors:
+            raise self._errors[0]
@@ -0,0 +1,272 @@
+"""Persistent ingestion state shared across runs.
+
+A small SQLite database (``ingestion_state_path``) remembers, per arXiv
+query, the newest submission date already ingested, so scheduled refreshes
+only fetch and embed papers submitted since the previous run.
+
+It also keeps a manifest for every API ingestion run: its parameters, the
+arXiv paging cursor up to which everything is durably stored in Qdrant, and
+the number of committed checkpoints, so a failed run can be resumed where it
+stopped instead of starting over. A running run holds a lease that its owner
+renews with heartbeats; only failed runs and runs whose lease expired (the
+process died) can be claimed for resumption, so two workers never continue
+the same cursor.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Iterator
+
+from rag_api.settings import get_settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS high_water_marks (
+    query TEXT PRIMARY KEY,
+    published TEXT NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    query TEXT NOT NULL,
+    params TEXT NOT NULL,
+    status TEXT NOT NULL,
+    cursor INTEGER NOT NULL DEFAULT 0,
+    checkpoints INTEGER NOT NULL DEFAULT 0,
+    ingested INTEGER NOT NULL DEFAULT 0,
+    newest_published TEXT,
+    error TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL,
+    owner TEXT,
+    heartbeat REAL
+);
+CREATE INDEX IF NOT EXISTS runs_by_query ON runs (query, created_at);
+"""
+
+_RUN_COLUMNS = (
+    "run_id, query, params, status, cursor, checkpoints, ingested, newest_published, error, "
+    "created_at, updated_at, owner, heartbeat"
+)
+# Columns added to ``runs`` after its first release, created on older databases.
+_RUN_MIGRATIONS = {"owner": "TEXT", "heartbeat": "REAL"}
+# Statuses of runs that stopped before completing.
+_UNFINISHED = ("running", "failed")
+
+
+@dataclass(frozen=True)
+class RunManifest:
+    """Progress of one ingestion run as of its last durable checkpoint.
+
+    ``cursor`` is the arXiv result offset below which every paper has been
+    stored (or skipped as unchanged or a near-duplicate); ``params`` are the
+    arguments needed to continue the same listing.
+    """
+
+    run_id: str
+    query: str
+    params: dict[str, Any]
+    status: str
+    cursor: int
+    checkpoints: int
+    ingested: int
+    newest_published: str | None
+    error: str | None
+    created_at: float
+    updated_at: float
+    owner: str | None = None
+    heartbeat: float | None = None
+
+    @classmethod
+    def from_row(cls, row: tuple) -> RunManifest:
+        values = list(row)
+        values[2] = json.loads(values[2])
+        return cls(*values)
+
+
+class IngestionState:
+    """SQLite-backed store of per-query ingestion progress."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path).expanduser()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(runs)")}
+        for column, kind in _RUN_MIGRATIONS.items():
+            if column not in columns:
+                self._conn.execute(f"ALTER TABLE runs ADD COLUMN {column} {kind}")
+        self._conn.commit()
+        self.owner = f"{socket.gethostname()}:{os.getpid()}"
+
+    @staticmethod
+    def _key(query: str) -> str:
+        return " ".join(query.split())
+
+    def get_high_water_mark(self, query: str) -> str | None:
+        """Return the newest ``published`` timestamp ingested for ``query``."""
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT published FROM high_water_marks WHERE query = ?", (self._key(query),)
+            ).fetchone()
+        return row[0] if row else None
+
+    def set_high_water_mark(self, query: str, published: str) -> None:
+        """Advance the mark for ``query``; an older timestamp never moves it back."""
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO high_water_marks (query, published, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT (query) DO UPDATE SET "
+                "published = max(published, excluded.published), updated_at = excluded.updated_at",
+                (self._key(query), published, time.time()),
+            )
+            self._conn.commit()
+
+    def clear_high_water_mark(self, query: str) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM high_water_marks WHERE query = ?", (self._key(query),))
+            self._conn.commit()
+
+    @staticmethod
+    def _lease_cutoff() -> float:
+        return time.time() - get_settings().ingestion_run_lease_seconds
+
+    def start_run(self, query: str, params: dict[str, Any]) -> RunManifest:
+        """Record a new ``running`` manifest for ``query``, owned by this process.
+
+        Older unfinished runs of the query that are not alive are marked
+        ``superseded``, so a later resume never rewinds to them.
+        """
+
+        run_id = uuid.uuid4().hex[:12]
+        now = time.time()
+        key = self._key(query)
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = 'superseded', updated_at = ? WHERE query = ? "
+                "AND status IN (?, ?) AND (status = 'failed' OR coalesce(heartbeat, 0) < ?)",
+                (now, key, *_UNFINISHED, self._lease_cutoff()),
+            )
+            self._conn.execute(
+                "INSERT INTO runs (run_id, query, params, status, created_at, updated_at, owner, heartbeat) "
+                "VALUES (?, ?, ?, 'running', ?, ?, ?, ?)",
+                (run_id, key, json.dumps(params, sort_keys=True), now, now, self.owner, now),
+            )
+            self._conn.commit()
+        return self.get_run(run_id)
+
+    def get_run(self, run_id: str) -> RunManifest | None:
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {_RUN_COLUMNS} FROM runs WHERE run_id = ?", (run_id,)
+            ).fetchone()
+        return RunManifest.from_row(row) if row else None
+
+    def claim_unfinished_run(self, query: str) -> RunManifest | None:
+        """Take over the most recent resumable run for ``query``, if any.
+
+        Only runs newer than the query's latest completed run qualify, and
+        of those only ``failed`` runs and ``running`` runs whose lease has
+        expired; runs still heartbeating in another job or process are left
+        alone. The claim is atomic across processes sharing the database.
+        """
+
+        key = self._key(query)
+        now = time.time()
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                row = self._conn.execute(
+                    f"SELECT {_RUN_COLUMNS} FROM runs WHERE query = ? AND status IN (?, ?) "
+                    "AND (status = 'failed' OR coalesce(heartbeat, 0) < ?) "
+                    "AND created_at > coalesce("
+                    "(SELECT max(created_at) FROM runs WHERE query = ? AND status = 'completed'), 0) "
+                    "ORDER BY created_at DESC LIMIT 1",
+                    (key, *_UNFINISHED, self._lease_cutoff(), key),
+                ).fetchone()
+                if row is not None:
+                    self._conn.execute(
+                        "UPDATE runs SET status = 'running', owner = ?, heartbeat = ?, updated_at = ? "
+                        "WHERE run_id = ?",
+                        (self.owner, now, now, row[0]),
+                    )
+                self._conn.commit()
+            except BaseException:
+                self._conn.rollback()
+                raise
+        return self.get_run(row[0]) if row else None
+
+    def heartbeat(self, run_id: str) -> None:
+        """Renew this process's lease on a running run."""
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET heartbeat = ? WHERE run_id = ? AND status = 'running'",
+                (time.time(), run_id),
+            )
+            self._conn.commit()
+
+    @contextmanager
+    def lease(self, run_id: str) -> Iterator[None]:
+        """Heartbeat ``run_id`` from a background thread while the block runs."""
+
+        stop = threading.Event()
+        interval = max(get_settings().ingestion_run_lease_seconds / 4, 0.05)
+
+        def beat() -> None:
+            while not stop.wait(interval):
+                self.heartbeat(run_id)
+
+        thread = threading.Thread(target=beat, name=f"run-lease-{run_id}", daemon=True)
+        thread.start()
+        try:
+            yield
+        finally:
+            stop.set()
+            thread.join()
+
+    def checkpoint(
+        self, run_id: str, cursor: int, ingested: int, newest_published: str | None
+    ) -> None:
+        """Durably record that everything before ``cursor`` is stored."""
+
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET cursor = ?, checkpoints = checkpoints + 1, ingested = ?, "
+                "newest_published = coalesce(max(newest_published, ?), newest_published, ?), "
+                "status = 'running', error = NULL, updated_at = ?, heartbeat = ? WHERE run_id = ?",
+                (cursor, ingested, newest_published, newest_published, now, now, run_id),
+            )
+            self._conn.commit()
+
+    def finish_run(self, run_id: str, status: str, error: str | None = None) -> None:
+        """Mark a run ``completed`` or ``failed``."""
+
+        with self._lock:
+            self._conn.execute(
+                "UPDATE runs SET status = ?, error = ?, updated_at = ? WHERE run_id = ?",
+                (status, error, time.time(), run_id),
+            )
+            self._conn.commit()
+
+
+@lru_cache
+def get_ingestion_state() -> IngestionState:
+    """Return the process-wide ingestion state store."""
+
+    return IngestionState(get_settings().ingestion_state_path)
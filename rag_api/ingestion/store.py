@@ -2,75 +2,383 @@
 
 from __future__ import annotations
 
+import hashlib
+import json
+import logging
+import time
 import uuid
-from typing import Iterable
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Iterable, Iterator
 
 from langchain_core.documents import Document
-from qdrant_client.http.models import Distance, PointStruct, VectorParams
+from langchain_core.embeddings import Embeddings
+from qdrant_client import QdrantClient
+from qdrant_client.http import models
+from qdrant_client.http.models import PointStruct
 
+from rag_api.clients.arxiv import split_arxiv_id
+from rag_api.clients.embedding_registry import get_embedding_dimension
 from rag_api.clients.embeddings import get_embeddings
-from rag_api.clients.qdrant import get_qdrant_client
+from rag_api.clients.qdrant import (
+    PAYLOAD_INDEXES,
+    SPARSE_VECTOR_NAME,
+    get_collection_profile,
+    get_qdrant_client,
+    hybrid_search_ready,
+    reset_hybrid_search_status,
+)
+from rag_api.clients.sparse import get_sparse_encoder
+from rag_api.ingestion.metrics import StageCounter
 from rag_api.settings import get_settings
 
+LOGGER = logging.getLogger(__name__)
+
+# Namespace for deterministic point IDs; changing it re-keys every point.
+POINT_ID_NAMESPACE = uuid.uuid5(uuid.NAMESPACE_URL, "https://arxiv.org/abs/")
+
+# Version of the vectors built for a point (see sparse_text). Bump it when
+# they change so stored points are re-embedded once on the next ingest.
+VECTOR_LAYOUT_VERSION = 2
 
-def _get_embedding_dimension() -> int:
-    """Get the dimension size for the current embedding model."""
-    settings = get_settings()
-    embeddings = get_embeddings()
-    
-    # Get dimension by embedding a test string
-    test_embedding = embeddings.embed_query("test")
-    return len(test_embedding)
 
+def ensure_collection() -> list[str]:
+    """Ensure target Qdrant collection exists with correct vector dimensions.
 
-def ensure_collection() -> None:
-    """Ensure target Qdrant collection exists with correct vector dimensions."""
+    New collections are created from the configured collection profile
+    (quantization, HNSW, on-disk storage, segments). For an existing
+    collection the differences from that profile are logged and returned;
+    a dimension mismatch is an error. Missing payload indexes for the
+    filterable metadata fields are created either way, and points left over
+    from before deterministic point IDs are reported (see
+    :func:`delete_legacy_points`).
+    """
 
     settings = get_settings()
     client = get_qdrant_client()
     collections = client.get_collections().collections
     names = [collection.name for collection in collections]
+    profile = get_collection_profile()
 
     if settings.qdrant_collection in names:
         collection_info = client.get_collection(settings.qdrant_collection)
         current_size = collection_info.config.params.vectors.size if collection_info.config.params.vectors else 384
-        expected_size = _get_embedding_dimension()
+        expected_size = get_embedding_dimension()
         if current_size != expected_size:
             raise ValueError(
                 f"Collection '{settings.qdrant_collection}' has dimension {current_size}, "
                 f"but current embedding model requires {expected_size}. "
                 "Please delete the collection or use a different collection name."
             )
-        return
+        _ensure_payload_indexes(client, settings.qdrant_collection, collection_info.payload_schema)
+        legacy = count_legacy_points(client, settings.qdrant_collection)
+        if legacy:
+            LOGGER.warning(
+                "Collection '%s' has %s points stored with random IDs by an older version; "
+                "re-ingesting their papers adds a second copy. Delete them with "
+                "`rag-api-ingest --drop-legacy-points` (then re-ingest), or recreate the collection.",
+                settings.qdrant_collection,
+                legacy,
+            )
+        drift = profile.drift(collection_info)
+        for difference in drift:
+            LOGGER.warning(
+                "Collection '%s' differs from profile '%s': %s",
+                settings.qdrant_collection,
+                profile.name,
+                difference,
+            )
+        return drift
 
-    dimension = _get_embedding_dimension()
+    dimension = get_embedding_dimension()
+    LOGGER.info(
+        "Creating collection '%s' (dimension=%s, profile=%s)",
+        settings.qdrant_collection,
+        dimension,
+        profile.name,
+    )
     client.create_collection(
         collection_name=settings.qdrant_collection,
-        vectors_config=VectorParams(size=dimension, distance=Distance.COSINE),
+        **profile.create_kwargs(dimension),
     )
+    _ensure_payload_indexes(client, settings.qdrant_collection, {})
+    reset_hybrid_search_status()
+
+    # Signatures of points from a previous incarnation of the collection
+    # would otherwise mark new chunks as duplicates of missing points.
+    from rag_api.ingestion.dedup import get_near_duplicate_index
+
+    index = get_near_duplicate_index()
+    if index is not None:
+        index.clear()
+    return []
+
+
+def _ensure_payload_indexes(client: QdrantClient, collection: str, existing: dict) -> None:
+    for field_name, schema in PAYLOAD_INDEXES.items():
+        if field_name in existing:
+            continue
+        LOGGER.info("Creating %s payload index on '%s'", schema.value, field_name)
+        client.create_payload_index(
+            collection_name=collection, field_name=field_name, field_schema=schema
+        )
+
+
+# Points written before deterministic IDs have random uuid4 IDs and no
+# content hash, so the unchanged-point skip can never match them.
+_LEGACY_POINTS = models.Filter(
+    must=[models.IsEmptyCondition(is_empty=models.PayloadField(key="content_hash"))]
+)
+
+
+def count_legacy_points(client: QdrantClient, collection: str) -> int:
+    """Count points without a ``content_hash`` payload (pre-deterministic-ID points)."""
+
+    return client.count(collection_name=collection, count_filter=_LEGACY_POINTS, exact=True).count
+
 
+def delete_legacy_points() -> int:
+    """Delete the configured collection's points that predate deterministic IDs.
 
-def upsert_documents(documents: Iterable[Document]) -> int:
-    """Embed and upsert documents into Qdrant, returning count processed."""
+    One-off cleanup for collections ingested by older versions; their papers
+    must be ingested again afterwards. Returns the number of points deleted.
+    """
 
     settings = get_settings()
-    embeddings = get_embeddings()
     client = get_qdrant_client()
+    if not client.collection_exists(settings.qdrant_collection):
+        return 0
+    legacy = count_legacy_points(client, settings.qdrant_collection)
+    if legacy:
+        client.delete(
+            collection_name=settings.qdrant_collection,
+            points_selector=models.FilterSelector(filter=_LEGACY_POINTS),
+            wait=True,
+        )
+        LOGGER.info("Deleted %s legacy points from '%s'", legacy, settings.qdrant_collection)
+    return legacy
+
+
+def batched(documents: Iterable[Document], batch_size: int) -> Iterator[list[Document]]:
+    """Yield lists of at most ``batch_size`` documents without materialising the input."""
 
-    payloads = []
+    batch: list[Document] = []
     for document in documents:
-        payloads.append(
-            PointStruct(
-                id=str(uuid.uuid4()),
-                vector=embeddings.embed_query(document.page_content),
-                payload={
-                    "text": document.page_content,
-                    "metadata": document.metadata,
-                },
-            )
+        batch.append(document)
+        if len(batch) >= batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def content_hash(document: Document) -> str:
+    """Return a stable hash of a document's text and metadata."""
+
+    digest = hashlib.sha256(document.page_content.encode("utf-8"))
+    digest.update(json.dumps(document.metadata, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def stored_hash(digest: str, hybrid: bool) -> str:
+    """Return the hash stored with a point: its content hash plus the vector layout.
+
+    Points written under another layout (dense only versus dense and sparse,
+    or an older sparse text) no longer match and are rebuilt.
+    """
+
+    layout = f"hybrid-v{VECTOR_LAYOUT_VERSION}" if hybrid else "dense"
+    return hashlib.sha256(f"{digest}:{layout}".encode("utf-8")).hexdigest()
+
+
+def point_id(document: Document, digest: str | None = None) -> str:
+    """Derive a deterministic point ID from arXiv ID, version and chunk index.
+
+    Documents without an arXiv ID fall back to their content hash, so identical
+    content still maps onto the same point.
+    """
+
+    metadata = document.metadata
+    arxiv_id = metadata.get("arxiv_id")
+    if not arxiv_id or arxiv_id == "unknown":
+        return str(uuid.uuid5(POINT_ID_NAMESPACE, digest or content_hash(document)))
+
+    paper_id, version = split_arxiv_id(arxiv_id)
+    paper_id = metadata.get("paper_id") or paper_id
+    version = metadata.get("version") or version
+    chunk_index = metadata.get("chunk_index", 0)
+    key = f"{paper_id}v{version or 0}#{chunk_index}"
+    return str(uuid.uuid5(POINT_ID_NAMESPACE, key))
+
+
+def _filter_unchanged(
+    client: QdrantClient, collection: str, batch: list[Document], hybrid: bool
+) -> list[tuple[str, str, Document]]:
+    """Drop documents whose point already exists with the same stored hash.
+
+    Uses a single ``retrieve`` call per batch, before anything is embedded.
+    """
+
+    candidates: dict[str, tuple[str, Document]] = {}
+    for document in batch:
+        digest = content_hash(document)
+        candidates[point_id(document, digest)] = (stored_hash(digest, hybrid), document)
+
+    existing = client.retrieve(
+        collection_name=collection,
+        ids=list(candidates),
+        with_payload=["content_hash"],
+        with_vectors=False,
+    )
+    for record in existing:
+        key = str(record.id)
+        existing_hash = (record.payload or {}).get("content_hash")
+        if key in candidates and existing_hash == candidates[key][0]:
+            del candidates[key]
+
+    return [(key, digest, document) for key, (digest, document) in candidates.items()]
+
+
+def sparse_text(document: Document) -> str:
+    """Text indexed in the sparse vector: title and arXiv IDs followed by the chunk.
+
+    The title and IDs live only in metadata, so without them an exact
+    ``2401.01234`` or ``2401.01234v2`` query could not match on terms.
+    """
+
+    metadata = document.metadata
+    identifiers: list[str] = []
+    arxiv_id = metadata.get("arxiv_id")
+    if arxiv_id and arxiv_id != "unknown":
+        paper_id, version = split_arxiv_id(arxiv_id)
+        identifiers.append(metadata.get("paper_id") or paper_id)
+        version = metadata.get("version") or version
+        if version:
+            identifiers.append(f"{identifiers[0]}v{version}")
+    title = metadata.get("title") or ""
+    return "\n".join(part for part in (title, " ".join(identifiers), document.page_content) if part)
+
+
+def _point_vector(dense: list[float], document: Document, hybrid: bool) -> list[float] | dict:
+    if not hybrid:
+        return dense
+    sparse = get_sparse_encoder().encode_document(sparse_text(document))
+    if not sparse.indices:
+        return {"": dense}
+    return {"": dense, SPARSE_VECTOR_NAME: sparse}
+
+
+def _build_points(
+    pending: list[tuple[str, str, Document]], vectors: list[list[float]], hybrid: bool
+) -> list[PointStruct]:
+    return [
+        PointStruct(
+            id=key,
+            vector=_point_vector(vector, document, hybrid),
+            payload={
+                "text": document.page_content,
+                "metadata": document.metadata,
+                "content_hash": digest,
+            },
         )
+        for (key, digest, document), vector in zip(pending, vectors)
+    ]
+
+
+def embed_batch(
+    batch: list[Document],
+    embeddings: Embeddings | None = None,
+    counters: dict[str, StageCounter] | None = None,
+) -> list[PointStruct]:
+    """Embed the documents of ``batch`` that are not already stored and return their points.
+
+    Documents whose point exists with an identical content hash and vector
+    layout are counted as ``skip`` and never reach the embedding model.
+    """
 
-    if payloads:
-        client.upsert(collection_name=settings.qdrant_collection, points=payloads)
+    counters = counters if counters is not None else {}
+    # Collections created before hybrid search only accept the dense vector.
+    hybrid = hybrid_search_ready()
+    to_embed = _filter_unchanged(get_qdrant_client(), get_settings().qdrant_collection, batch, hybrid)
+    counters.setdefault("skip", StageCounter("skip")).add(len(batch) - len(to_embed))
+    if not to_embed:
+        return []
+    embeddings = embeddings or get_embeddings()
+    vectors = embeddings.embed_documents([document.page_content for _, _, document in to_embed])
+    points = _build_points(to_embed, vectors, hybrid)
+    counters.setdefault("embed", StageCounter("embed")).add(len(points))
+    return points
+
+
+def write_points(points: list[PointStruct], counters: dict[str, StageCounter] | None = None) -> int:
+    """Upsert ``points`` into the configured collection and return how many were written."""
+
+    counters = counters if counters is not None else {}
+    get_qdrant_client().upsert(collection_name=get_settings().qdrant_collection, points=points)
+    counters.setdefault("upsert", StageCounter("upsert")).add(len(points))
+    return len(points)
+
+
+def upsert_documents(
+    documents: Iterable[Document],
+    batch_size: int | None = None,
+    counters: dict[str, StageCounter] | None = None,
+    embeddings: Embeddings | None = None,
+) -> int:
+    """Embed and upsert documents into Qdrant, returning count processed.
+
+    Documents are embedded in batches via ``embed_documents``. Each batch is
+    upserted on a background thread while the next batch is being embedded, so
+    wall time scales with the number of batches rather than documents.
+
+    Point IDs are deterministic (see :func:`point_id`) and points that are
+    already stored with identical content are skipped before embedding, so
+    re-running an ingest costs one existence lookup per batch. Returns the
+    number of points written.
+
+    ``counters`` receives live ``skip``/``embed``/``upsert`` stage counters so
+    callers can report progress while the upsert is still running.
+    ``embeddings`` overrides the configured model (benchmarks use a fake).
+    """
+
+    settings = get_settings()
+    embeddings = embeddings or get_embeddings()
+    effective_batch_size = max(batch_size or settings.ingestion_batch_size, 1)
+    counters = counters if counters is not None else {}
+    for name in ("skip", "embed", "upsert"):
+        counters.setdefault(name, StageCounter(name))
+
+    started = time.perf_counter()
+    count = 0
+    skipped = 0
+    pending: Future | None = None
+
+    with ThreadPoolExecutor(max_workers=1, thread_name_prefix="qdrant-upsert") as executor:
+        for batch in batched(documents, effective_batch_size):
+            points = embed_batch(batch, embeddings, counters)
+            skipped += len(batch) - len(points)
+            if not points:
+                continue
+
+            # Wait for the previous upsert before queueing the next one so at
+            # most one batch of points is in flight.
+            if pending is not None:
+                pending.result()
+            pending = executor.submit(write_points, points, counters)
+            count += len(points)
+
+        if pending is not None:
+            pending.result()
+
+    elapsed = time.perf_counter() - started
+    if skipped:
+        LOGGER.info("Skipped %s documents already stored with identical content", skipped)
+    if count:
+        LOGGER.info(
+            "Upserted %s documents in %.2fs (%.1f docs/sec, batch_size=%s)",
+            count,
+            elapsed,
+            count / elapsed if elapsed > 0 else float("inf"),
+            effective_batch_size,
+        )
 
-    return len(payloads)
+    return count
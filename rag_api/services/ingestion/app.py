@@ -2,47 +2,153 @@
 
 from __future__ import annotations
 
-import logging
+import asyncio
+import json
+import time
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 
 from fastapi import FastAPI, HTTPException
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 
-from rag_api.ingestion.pipeline import run_ingestion
+from rag_api.clients.http import close_http_clients
+from rag_api.clients.ratelimit import get_arxiv_rate_limiter
+from rag_api.ingestion.arxiv import ARXIV_MAX_RESULTS
 from rag_api.logging import configure_logging
+from rag_api.services.ingestion.jobs import IngestionJob, JobManager
 from rag_api.settings import get_settings
 
 
 class IngestionRequest(BaseModel):
     query: str | None = Field(default=None, description="arXiv search query")
-    max_docs: int | None = Field(default=None, ge=0, le=25)
+    max_docs: int | None = Field(default=None, ge=0, le=ARXIV_MAX_RESULTS)
+    full_text: bool = Field(default=False, description="Ingest PDF full text instead of abstracts")
+    full_refresh: bool = Field(
+        default=False, description="Ignore the query's high-water mark for this run"
+    )
+    resume: bool = Field(
+        default=False, description="Continue the query's last failed run from its last checkpoint"
+    )
 
 
 class IngestionResponse(BaseModel):
     ingested: int
+    fetched: int = 0
+    query: str
+    stages: dict[str, dict[str, float]] = Field(default_factory=dict)
+    since: str | None = None
+    high_water_mark: str | None = None
+    run_id: str | None = None
+    resumed_from: int | None = None
+
+
+class JobResponse(BaseModel):
+    job_id: str
+    status: str
     query: str
+    max_docs: int
+    full_text: bool = False
+    full_refresh: bool = False
+    resume: bool = False
+    fetched: int = 0
+    embedded: int = 0
+    upserted: int = 0
+    skipped: int = 0
+    near_duplicates: int = 0
+    elapsed_seconds: float = 0.0
+    docs_per_sec: float = 0.0
+    created_at: float
+    started_at: float | None = None
+    finished_at: float | None = None
+    error: str | None = None
+    result: IngestionResponse | None = None
+
+
+def _job_response(job: IngestionJob) -> JobResponse:
+    return JobResponse(**job.snapshot(), result=job.result)
 
 
 def create_app() -> FastAPI:
     settings = get_settings()
     configure_logging()
-    api = FastAPI(title="RAG Ingestion Service")
+    jobs = JobManager(max_concurrent_jobs=settings.ingestion_max_concurrent_jobs)
+
+    @asynccontextmanager
+    async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+        yield
+        jobs.shutdown()
+        close_http_clients()
+
+    api = FastAPI(title="RAG Ingestion Service", lifespan=lifespan)
+    api.state.jobs = jobs
+
+    def _get_job(job_id: str) -> IngestionJob:
+        job = jobs.get(job_id)
+        if job is None:
+            raise HTTPException(status_code=404, detail=f"Unknown job '{job_id}'")
+        return job
 
     @api.get("/health")
     async def health():
-        return {"status": "healthy", "service": "ingestion"}
+        return {
+            "status": "healthy",
+            "service": "ingestion",
+            "arxiv_rate_limiter": get_arxiv_rate_limiter().stats(),
+        }
+
+    @api.post("/ingest", response_model=JobResponse, status_code=202)
+    async def ingest(payload: IngestionRequest) -> JobResponse:
+        """Queue an ingestion job and return its ID immediately."""
 
-    @api.post("/ingest", response_model=IngestionResponse)
-    async def ingest(payload: IngestionRequest) -> IngestionResponse:
         query = payload.query or settings.arxiv_query
         max_docs = payload.max_docs or settings.arxiv_max_docs
 
         try:
-            summary = run_ingestion(query=query, max_docs=max_docs)
-        except Exception as exc:
-            logging.exception("Ingestion failed: %s", exc)
-            raise HTTPException(status_code=500, detail="Ingestion failed") from exc
-
-        return IngestionResponse(**summary)
+            job = jobs.submit(
+                query=query,
+                max_docs=max_docs,
+                full_text=payload.full_text,
+                full_refresh=payload.full_refresh,
+                resume=payload.resume,
+            )
+        except RuntimeError as exc:
+            raise HTTPException(status_code=503, detail=str(exc)) from exc
+        return _job_response(job)
+
+    @api.get("/jobs", response_model=list[JobResponse])
+    async def list_jobs() -> list[JobResponse]:
+        return [_job_response(job) for job in jobs.list()]
+
+    @api.get("/jobs/{job_id}", response_model=JobResponse)
+    async def get_job(job_id: str) -> JobResponse:
+        return _job_response(_get_job(job_id))
+
+    @api.get("/jobs/{job_id}/events")
+    async def job_events(job_id: str) -> StreamingResponse:
+        """Stream job progress as server-sent events until the job finishes."""
+
+        job = _get_job(job_id)
+        interval = settings.ingestion_progress_interval
+
+        async def generate_stream() -> AsyncIterator[str]:
+            last_upserted, last_time = 0, time.monotonic()
+            while True:
+                snapshot = _job_response(job).model_dump()
+                now = time.monotonic()
+                # Rate over the last interval, alongside the run-wide average.
+                snapshot["current_rate"] = round(
+                    (snapshot["upserted"] - last_upserted) / max(now - last_time, 1e-6), 2
+                )
+                last_upserted, last_time = snapshot["upserted"], now
+
+                event = "done" if job.done else "progress"
+                yield f"event: {event}\ndata: {json.dumps(snapshot)}\n\n"
+                if job.done:
+                    return
+                await asyncio.sleep(interval)
+
+        return StreamingResponse(generate_stream(), media_type="text/event-stream")
 
     return api
 
@@ -54,12 +160,15 @@ def main() -> None:
     settings = get_settings()
     import uvicorn
 
-    uvicorn.run(
-        "rag_api.services.ingestion.app:app",
-        host=settings.ingestion_host,
-        port=settings.ingestion_port,
-        reload=False,
-    )
+    class Server(uvicorn.Server):
+        def handle_exit(self, sig, frame) -> None:
+            # uvicorn waits for open responses before the lifespan shutdown;
+            # fail the jobs first so their event streams can finish.
+            app.state.jobs.shutdown()
+            super().handle_exit(sig, frame)
+
+    config = uvicorn.Config(app, host=settings.ingestion_host, port=settings.ingestion_port)
+    Server(config).run()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,194 @@
+"""Background ingestion jobs for the ingestion service."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Literal
+
+from rag_api.ingestion.metrics import StageCounter
+from rag_api.ingestion.pipeline import IngestionCancelled, run_ingestion
+
+LOGGER = logging.getLogger(__name__)
+
+JobStatus = Literal["queued", "running", "succeeded", "failed"]
+TERMINAL_STATUSES: frozenset[str] = frozenset({"succeeded", "failed"})
+
+
+@dataclass
+class IngestionJob:
+    """State of one queued or running ingestion."""
+
+    query: str
+    max_docs: int
+    full_text: bool = False
+    full_refresh: bool = False
+    resume: bool = False
+    id: str = field(default_factory=lambda: uuid.uuid4().hex)
+    status: JobStatus = "queued"
+    created_at: float = field(default_factory=time.time)
+    started_at: float | None = None
+    finished_at: float | None = None
+    counters: dict[str, StageCounter] = field(default_factory=dict)
+    result: dict[str, Any] | None = None
+    error: str | None = None
+    cancel: threading.Event = field(default_factory=threading.Event, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in TERMINAL_STATUSES
+
+    def _count(self, stage: str) -> int:
+        counter = self.counters.get(stage)
+        return counter.items if counter is not None else 0
+
+    def snapshot(self) -> dict[str, Any]:
+        """Return a JSON-serialisable view of the job's progress."""
+
+        end = self.finished_at or time.time()
+        elapsed = end - self.started_at if self.started_at else 0.0
+        upserted = self._count("upsert")
+        return {
+            "job_id": self.id,
+            "status": self.status,
+            "query": self.query,
+            "max_docs": self.max_docs,
+            "full_text": self.full_text,
+            "full_refresh": self.full_refresh,
+            "resume": self.resume,
+            "fetched": self._count("fetch"),
+            "embedded": self._count("embed"),
+            "upserted": upserted,
+            "skipped": self._count("skip"),
+            "near_duplicates": self._count("near_duplicate"),
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_sec": round(upserted / elapsed, 2) if elapsed > 0 else 0.0,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "error": self.error,
+        }
+
+
+class JobManager:
+    """Run ingestion jobs on a bounded worker pool, keeping recent job history.
+
+    At most ``max_concurrent_jobs`` ingestions run at once; further jobs wait
+    in the executor queue with status ``queued``. :meth:`shutdown` fails every
+    unfinished job.
+    """
+
+    def __init__(self, max_concurrent_jobs: int, max_history: int = 200) -> None:
+        self._executor = ThreadPoolExecutor(
+            max_workers=max(max_concurrent_jobs, 1), thread_name_prefix="ingest-job"
+        )
+        self._jobs: OrderedDict[str, IngestionJob] = OrderedDict()
+        self._lock = threading.Lock()
+        self._max_history = max_history
+        self._closing = threading.Event()
+
+    @property
+    def closing(self) -> bool:
+        return self._closing.is_set()
+
+    def submit(
+        self,
+        query: str,
+        max_docs: int,
+        full_text: bool = False,
+        full_refresh: bool = False,
+        resume: bool = False,
+    ) -> IngestionJob:
+        if self.closing:
+            raise RuntimeError("The ingestion service is shutting down")
+        job = IngestionJob(
+            query=query,
+            max_docs=max_docs,
+            full_text=full_text,
+            full_refresh=full_refresh,
+            resume=resume,
+        )
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._executor.submit(self._run, job)
+        LOGGER.info("Queued ingestion job %s for query '%s'", job.id, query)
+        return job
+
+    def get(self, job_id: str) -> IngestionJob | None:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> list[IngestionJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def shutdown(self) -> None:
+        """Stop taking jobs and fail every queued or running one.
+
+        Running ingestions are cancelled at their next document and their run
+        manifests marked failed, so ``resume`` can continue them later. Jobs
+        turn ``failed`` immediately, which ends their event streams. Safe to
+        call more than once.
+        """
+
+        if self._closing.is_set():
+            return
+        self._closing.set()
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        now = time.time()
+        with self._lock:
+            for job in self._jobs.values():
+                if job.done:
+                    continue
+                job.cancel.set()
+                job.error = (
+                    "Ingestion service shut down; resume the query to continue"
+                    if job.status == "running"
+                    else "Ingestion service shut down before the job started"
+                )
+                job.status = "failed"
+                job.finished_at = now
+                LOGGER.warning("Ingestion job %s failed: service shutting down", job.id)
+
+    def _prune(self) -> None:
+        # Forget the oldest finished jobs once history exceeds its bound.
+        excess = len(self._jobs) - self._max_history
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.done][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob) -> None:
+        with self._lock:
+            if job.cancel.is_set():
+                return
+            job.status = "running"
+            job.started_at = time.time()
+        try:
+            result = run_ingestion(
+                query=job.query,
+                max_docs=job.max_docs,
+                full_text=job.full_text,
+                full_refresh=job.full_refresh,
+                resume=job.resume,
+                counters=job.counters,
+                cancel=job.cancel,
+            )
+        except IngestionCancelled:
+            LOGGER.info("Ingestion job %s cancelled", job.id)
+            return
+        except Exception as exc:  # noqa: BLE001
+            LOGGER.exception("Ingestion job %s failed: %s", job.id, exc)
+            status, error, result = "failed", str(exc), None
+        else:
+            status, error = "succeeded", None
+        with self._lock:
+            # shutdown() has already reported the job as failed.
+            if job.cancel.is_set():
+                return
+            job.result, job.error, job.status = result, error, status
+            job.finished_at = time.time()
@@ -15,6 +15,7 @@ except ImportError:
 
 from langgraph.prebuilt import create_react_agent
 
+from rag_api.clients.http import get_http_client, get_loop_async_http_client
 from rag_api.services.langchain.tools import get_tools
 from rag_api.settings import get_settings
 
@@ -67,6 +68,9 @@ def get_llm_model() -> BaseChatModel:
         "model": settings.openai_model,
         "api_key": settings.openai_api_key.strip(),
         "temperature": 0,
+        "http_client": get_http_client(),
+        # The agent is built at import time, before the server's loop runs.
+        "http_async_client": get_loop_async_http_client(),
     }
     
     if settings.openai_base_url:
@@ -4,6 +4,45 @@ from __future__ import annotations
 
 from agentlightning import PromptTemplate
 
+from rag_api.settings import get_settings
+
+
+def _rag_query_description() -> str:
+    """Describe ``rag_query`` as currently configured (filters, reranking, result count)."""
+    settings = get_settings()
+    top_n = max(settings.rag_top_n, 1)
+    ranking = (
+        "The best matches are re-scored by a cross-encoder before the top chunks are kept. "
+        if settings.rerank_enabled
+        else ""
+    )
+    if settings.rag_selection == "mmr":
+        ranking += (
+            "Returned chunks are picked to cover different aspects of the query "
+            "rather than repeating near-identical passages. "
+        )
+    if settings.rag_max_chunks_per_paper:
+        ranking += (
+            f"At most {settings.rag_max_chunks_per_paper} chunk(s) come from any one paper, "
+            f"so results span several papers and fewer than {top_n} chunks can be returned "
+            "when only a few papers match. "
+        )
+    return (
+        "1. **rag_query(query: str, categories: list[str] | None = None, "
+        "published_after: str | None = None, published_before: str | None = None, "
+        "arxiv_ids: list[str] | None = None)**: Searches the ingested arXiv knowledge base "
+        "(Qdrant vector database) by meaning and by exact terms (method names, acronyms, arXiv IDs). "
+        "This is fast and searches papers that have been previously ingested. "
+        "Optional filters narrow the search: categories (e.g. [\"cs.CL\"]), "
+        "published_after / published_before (dates like \"2023-01-01\"; a date-only published_before "
+        "includes that whole day) and arxiv_ids (e.g. [\"2401.01234\"]). "
+        f"{ranking}"
+        f"Returns up to {top_n} chunks with truncated text "
+        f"(max {settings.rag_chunk_max_length} chars per chunk) to prevent context overflow. "
+        "Returns 'RAG_EMPTY' if no matches are found, or 'RAG_ERROR' if a filter value is invalid "
+        "(fix the value and retry).\n"
+    )
+
 
 def get_baseline_prompt_template() -> str:
     """Return baseline system prompt."""
@@ -13,11 +52,7 @@ def get_baseline_prompt_template() -> str:
         "a curated knowledge base of arXiv papers (vector database) and direct arXiv API searches.\n\n"
         
         "## Available Tools\n\n"
-        "1. **rag_query(query: str)**: Searches the ingested arXiv knowledge base (Qdrant vector database) "
-        "for relevant research papers and document chunks using semantic similarity. "
-        "This is fast and searches papers that have been previously ingested. "
-        "Returns up to 3 chunks with truncated text (max 1000 chars per chunk) to prevent context overflow. "
-        "Returns 'RAG_EMPTY' if no matches are found.\n"
+        f"{_rag_query_description()}"
         "2. **arxiv_search(query: str, max_results: int = 3)**: Searches arXiv directly via API for research papers. "
         "This provides broader coverage and can find recent papers not yet ingested into the knowledge base. "
         "Returns up to 3 papers (default) with truncated summaries (max 400 chars) to prevent context overflow. "
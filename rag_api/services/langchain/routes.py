@@ -145,7 +145,7 @@ async def query(request: QueryRequest) -> QueryResponse:
 
     try:
         logger.info(f"Received query: {request.question[:100]}...")
-        response = agent.invoke(
+        response = await agent.ainvoke(
             {"messages": [{"role": "user", "content": request.question}]}
         )
         
@@ -408,7 +408,7 @@ async def query_stream(request: QueryRequest) -> StreamingResponse:
 async def debug() -> dict[str, Any]:
     """Get detailed debug information for troubleshooting."""
     import logging
-    from rag_api.clients.qdrant import get_qdrant_client
+    from rag_api.clients.qdrant import get_collection_profile, get_qdrant_client
     from rag_api.clients.openai import get_openai_client
     
     logger = logging.getLogger(__name__)
@@ -438,9 +438,13 @@ async def debug() -> dict[str, Any]:
         # Check collection info if it exists
         if settings.qdrant_collection in collection_names:
             info = client.get_collection(settings.qdrant_collection)
+            vectors = info.config.params.vectors
             debug_info["qdrant"]["collection_info"] = {
                 "points_count": info.points_count,
                 "vectors_count": info.vectors_count if hasattr(info, 'vectors_count') else 0,
+                "vector_size": getattr(vectors, "size", None),
+                "profile": get_collection_profile().name,
+                "profile_drift": get_collection_profile().drift(info),
             }
         else:
             debug_info["qdrant"]["collection_info"] = {
@@ -473,25 +477,35 @@ async def debug() -> dict[str, Any]:
         }
         debug_info["status"] = "degraded"
     
-    # Test Embeddings
+    # Embeddings: report the model's dimension from the registry without
+    # embedding anything
     try:
-        from rag_api.clients.embeddings import get_embeddings
-        embeddings = get_embeddings()
-        test_embedding = embeddings.embed_query("test")
+        from rag_api.clients.embedding_cache import get_embedding_cache
+        from rag_api.clients.embedding_registry import lookup_dimension
+        from rag_api.clients.embeddings import get_embedding_model_name, get_embedding_namespace
+
+        dimension, dimension_source = lookup_dimension(get_embedding_namespace())
+        cache = get_embedding_cache()
         debug_info["embeddings"] = {
             "provider": settings.embedding_provider,
-            "model": settings.openai_embedding_model if settings.embedding_provider == "openai" else settings.huggingface_model,
-            "dimension": len(test_embedding),
-            "working": True,
+            "model": get_embedding_model_name(),
+            "dimension": dimension,
+            "dimension_source": dimension_source,
+            "cache": cache.stats() if cache is not None else {"enabled": False},
         }
+        collection_size = debug_info.get("qdrant", {}).get("collection_info", {}).get("vector_size")
+        if dimension is not None and collection_size is not None:
+            debug_info["embeddings"]["matches_collection"] = dimension == collection_size
     except Exception as exc:
-        logger.exception("Failed to test embeddings")
+        logger.exception("Failed to inspect embeddings")
         debug_info["embeddings"] = {
             "error": str(exc),
-            "working": False,
         }
         debug_info["status"] = "degraded"
-    
+
+    from rag_api.clients.ratelimit import get_arxiv_rate_limiter
+    debug_info["arxiv_rate_limiter"] = get_arxiv_rate_limiter().stats()
+
     return debug_info
 
 
@@ -1,42 +1,97 @@
-"""Tool definitions for the LangChain agent."""
+"""Tool definitions for the LangChain agent.
+
+Each tool has a blocking implementation for ``invoke`` and a native async
+one for ``ainvoke``/``astream``, so concurrent agent requests share one
+event loop instead of blocking it or holding threadpool slots.
+"""
 
 from __future__ import annotations
 
+import asyncio
 import logging
+import time
 from xml.etree import ElementTree as ET
 
+import httpx
 import requests
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
+from qdrant_client.http.models import ScoredPoint
 
+from rag_api.clients.arxiv import STREAM_CHUNK_SIZE, ArxivEntry, AtomFeedParser, iter_entries
 from rag_api.clients.embeddings import get_embeddings
-from rag_api.clients.qdrant import get_qdrant_client
+from rag_api.clients.http import get_async_http_client, get_http_session
+from rag_api.clients.mmr import mmr_select
+from rag_api.clients.qdrant import (
+    asearch_grouped_points,
+    asearch_points,
+    build_search_filter,
+    dense_vector,
+    search_grouped_points,
+    search_points,
+)
+from rag_api.clients.ratelimit import get_arxiv_rate_limiter
+from rag_api.clients.rerank import get_reranker
 from rag_api.settings import get_settings
 
 logger = logging.getLogger(__name__)
 
 
-@tool
-def rag_query(query: str) -> str:
-    """Query the Arxiv Qdrant collection for relevant chunks.
-    
-    Searches the ingested arXiv knowledge base using semantic similarity.
-    Returns up to 3 chunks (max 1000 chars each) or 'RAG_EMPTY' if no matches found."""
+def _candidate_limit(top_n: int) -> int:
+    settings = get_settings()
+    limit = top_n
+    if settings.rerank_enabled:
+        limit = max(limit, settings.rerank_candidates)
+    if settings.rag_selection == "mmr":
+        limit = max(limit, settings.mmr_candidates)
+    return limit
+
+
+def _select(
+    query: str,
+    query_vector: list[float],
+    results: list[ScoredPoint],
+    top_n: int,
+    timings: dict[str, float],
+) -> list[ScoredPoint]:
+    """Rerank and/or MMR-diversify the candidates, then keep the best ``top_n``."""
 
     settings = get_settings()
-    embeddings = get_embeddings()
-    client = get_qdrant_client()
+    relevance = None
+    if settings.rerank_enabled and len(results) > 1:
+        started = time.perf_counter()
+        scores = get_reranker().score(query, [(match.payload or {}).get("text", "") for match in results])
+        order = sorted(range(len(results)), key=scores.__getitem__, reverse=True)
+        results = [results[i] for i in order]
+        relevance = [scores[i] for i in order]
+        timings["rerank"] = time.perf_counter() - started
+
+    use_mmr = settings.rag_selection == "mmr"
+    vectors = [dense_vector(match) for match in results] if use_mmr else []
+    if use_mmr and len(results) > top_n and all(vector is not None for vector in vectors):
+        started = time.perf_counter()
+        if relevance is not None:
+            # Cross-encoder scores are unbounded logits; put them on the cosine scale.
+            low, high = min(relevance), max(relevance)
+            relevance = [(score - low) / (high - low) if high > low else 1.0 for score in relevance]
+        picked = mmr_select(query_vector, vectors, top_n, settings.mmr_lambda, relevance)
+        results = [results[i] for i in picked]
+        timings["mmr"] = time.perf_counter() - started
+    return results[:top_n]
+
 
-    results = client.search(
-        collection_name=settings.qdrant_collection,
-        query_vector=embeddings.embed_query(query),
-        limit=3,
+def _format_chunks(results: list[ScoredPoint], candidates: int, timings: dict[str, float]) -> str:
+    logger.info(
+        "rag_query timings: %s (candidates=%s, returned=%s)",
+        " ".join(f"{stage}={seconds * 1000:.1f}ms" for stage, seconds in timings.items()),
+        candidates,
+        len(results),
     )
 
     if not results:
         return "RAG_EMPTY: No matching documents found in the knowledge base."
 
     formatted = []
-    max_chunk_len = settings.rag_chunk_max_length
+    max_chunk_len = get_settings().rag_chunk_max_length
     
     for match in results:
         metadata = match.payload.get("metadata", {}) if match.payload else {}
@@ -52,8 +107,139 @@ def rag_query(query: str) -> str:
     return "\n\n".join(formatted)
 
 
-@tool
-def arxiv_search(query: str, max_results: int = 3) -> str:
+def _rag_query(
+    query: str,
+    categories: list[str] | None = None,
+    published_after: str | None = None,
+    published_before: str | None = None,
+    arxiv_ids: list[str] | None = None,
+) -> str:
+    """Query the Arxiv Qdrant collection for relevant chunks.
+    
+    Searches the ingested arXiv knowledge base by meaning and by exact terms
+    (method names, acronyms, arXiv IDs).
+    Optional filters narrow the search: categories (e.g. ["cs.CL"]),
+    published_after / published_before (dates like "2023-01-01"), and
+    arxiv_ids (e.g. ["2401.01234"]).
+    Returns the most relevant chunks (max 1500 chars each), 'RAG_EMPTY' if no matches found,
+    or 'RAG_ERROR' if a filter value is invalid."""
+
+    settings = get_settings()
+    top_n = max(settings.rag_top_n, 1)
+    limit = _candidate_limit(top_n)
+    with_vectors = settings.rag_selection == "mmr"
+    try:
+        query_filter = build_search_filter(categories, published_after, published_before, arxiv_ids)
+    except ValueError as exc:
+        return f"RAG_ERROR: {exc}"
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    query_vector = get_embeddings().embed_query(query)
+    timings["embed"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if settings.rag_max_chunks_per_paper:
+        results = search_grouped_points(
+            query,
+            query_vector,
+            limit=limit,
+            group_size=settings.rag_max_chunks_per_paper,
+            query_filter=query_filter,
+            with_vectors=with_vectors,
+        )
+    else:
+        results = search_points(
+            query, query_vector, limit=limit, query_filter=query_filter, with_vectors=with_vectors
+        )
+    timings["search"] = time.perf_counter() - started
+
+    selected = _select(query, query_vector, results, top_n, timings)
+    return _format_chunks(selected, len(results), timings)
+
+
+async def _arag_query(
+    query: str,
+    categories: list[str] | None = None,
+    published_after: str | None = None,
+    published_before: str | None = None,
+    arxiv_ids: list[str] | None = None,
+) -> str:
+    """Async ``rag_query``: awaits the embedding and Qdrant calls instead of blocking."""
+
+    settings = get_settings()
+    top_n = max(settings.rag_top_n, 1)
+    limit = _candidate_limit(top_n)
+    with_vectors = settings.rag_selection == "mmr"
+    try:
+        query_filter = build_search_filter(categories, published_after, published_before, arxiv_ids)
+    except ValueError as exc:
+        return f"RAG_ERROR: {exc}"
+    timings: dict[str, float] = {}
+
+    started = time.perf_counter()
+    query_vector = await get_embeddings().aembed_query(query)
+    timings["embed"] = time.perf_counter() - started
+
+    started = time.perf_counter()
+    if settings.rag_max_chunks_per_paper:
+        results = await asearch_grouped_points(
+            query,
+            query_vector,
+            limit=limit,
+            group_size=settings.rag_max_chunks_per_paper,
+            query_filter=query_filter,
+            with_vectors=with_vectors,
+        )
+    else:
+        results = await asearch_points(
+            query, query_vector, limit=limit, query_filter=query_filter, with_vectors=with_vectors
+        )
+    timings["search"] = time.perf_counter() - started
+
+    if settings.rerank_enabled:
+        # Cross-encoder inference is CPU-bound; keep it off the event loop.
+        selected = await asyncio.to_thread(_select, query, query_vector, results, top_n, timings)
+    else:
+        selected = _select(query, query_vector, results, top_n, timings)
+    return _format_chunks(selected, len(results), timings)
+
+
+rag_query = StructuredTool.from_function(func=_rag_query, coroutine=_arag_query, name="rag_query")
+
+
+def _format_entries(query: str, entries: list[ArxivEntry], max_results: int) -> str:
+    if not entries:
+        return f"ARXIV_EMPTY: No papers found for query '{query}' on arXiv."
+    
+    formatted = []
+    max_summary_len = get_settings().arxiv_summary_max_length
+    for entry in entries[:max_results]:
+        summary = entry.summary or "No summary available"
+        summary_short = summary[:max_summary_len] + "..." if len(summary) > max_summary_len else summary
+        
+        formatted.append(
+            f"[arXiv: {entry.title}]\n"
+            f"ID: {entry.arxiv_id}\n"
+            f"Summary: {summary_short}\n"
+            f"Link: {entry.abs_url}"
+        )
+    
+    return "\n\n---\n\n".join(formatted)
+
+
+def _arxiv_error(exc: Exception) -> str:
+    if isinstance(exc, (requests.RequestException, httpx.HTTPError)):
+        error_msg = f"ARXIV_ERROR: Failed to search arXiv API: {str(exc)}"
+    elif isinstance(exc, ET.ParseError):
+        error_msg = f"ARXIV_ERROR: Failed to parse arXiv API response: {str(exc)}"
+    else:
+        error_msg = f"ARXIV_ERROR: Unexpected error during arXiv search: {str(exc)}"
+    logger.error(error_msg, exc_info=True)
+    return error_msg
+
+
+def _arxiv_search(query: str, max_results: int = 3) -> str:
     """Search arXiv directly via API for research papers.
     
     Use when rag_query returns empty or insufficient results, or for recent papers.
@@ -64,7 +250,6 @@ def arxiv_search(query: str, max_results: int = 3) -> str:
     effective_max_results = min(max(max_results, 1), settings.arxiv_search_max_results)
     
     try:
-        api_url = "https://export.arxiv.org/api/query"
         params = {
             "search_query": query,
             "start": 0,
@@ -72,50 +257,50 @@ def arxiv_search(query: str, max_results: int = 3) -> str:
         }
         
         logger.debug(f"Searching arXiv with query: {query}, max_results: {effective_max_results}")
-        response = requests.get(api_url, params=params, timeout=30)
-        response.raise_for_status()
+        get_arxiv_rate_limiter().acquire()
+        with get_http_session().get(settings.arxiv_api_url, params=params, timeout=30, stream=True) as response:
+            response.raise_for_status()
+            entries = list(iter_entries(response.iter_content(STREAM_CHUNK_SIZE)))
         
-        root = ET.fromstring(response.content)
-        entries = root.findall("{http://www.w3.org/2005/Atom}entry")
+        return _format_entries(query, entries, effective_max_results)
         
-        if not entries:
-            return f"ARXIV_EMPTY: No papers found for query '{query}' on arXiv."
+    except Exception as exc:
+        return _arxiv_error(exc)
+
+
+async def _aarxiv_search(query: str, max_results: int = 3) -> str:
+    """Async ``arxiv_search``: waits for the rate limiter and streams the feed without blocking."""
+    settings = get_settings()
+    effective_max_results = min(max(max_results, 1), settings.arxiv_search_max_results)
+    
+    try:
+        params = {
+            "search_query": query,
+            "start": 0,
+            "max_results": effective_max_results,
+        }
         
-        formatted = []
-        for entry in entries[:effective_max_results]:
-            title_elem = entry.find("{http://www.w3.org/2005/Atom}title")
-            summary_elem = entry.find("{http://www.w3.org/2005/Atom}summary")
-            identifier_elem = entry.find("{http://www.w3.org/2005/Atom}id")
-            
-            title = title_elem.text.strip() if title_elem is not None and title_elem.text else "Untitled"
-            summary = summary_elem.text.strip() if summary_elem is not None and summary_elem.text else "No summary available"
-            arxiv_id = identifier_elem.text.split("/")[-1] if identifier_elem is not None and identifier_elem.text else "unknown"
-            link = f"https://arxiv.org/abs/{arxiv_id}"
-            
-            max_summary_len = settings.arxiv_summary_max_length
-            summary_short = summary[:max_summary_len] + "..." if len(summary) > max_summary_len else summary
-            
-            formatted.append(
-                f"[arXiv: {title}]\n"
-                f"ID: {arxiv_id}\n"
-                f"Summary: {summary_short}\n"
-                f"Link: {link}"
-            )
+        logger.debug(f"Searching arXiv with query: {query}, max_results: {effective_max_results}")
+        await get_arxiv_rate_limiter().acquire_async()
+        parser = AtomFeedParser()
+        entries: list[ArxivEntry] = []
+        async with get_async_http_client().stream(
+            "GET", settings.arxiv_api_url, params=params, timeout=30
+        ) as response:
+            response.raise_for_status()
+            async for chunk in response.aiter_bytes(STREAM_CHUNK_SIZE):
+                entries.extend(parser.feed(chunk))
+        entries.extend(parser.close())
         
-        return "\n\n---\n\n".join(formatted)
+        return _format_entries(query, entries, effective_max_results)
         
-    except requests.RequestException as exc:
-        error_msg = f"ARXIV_ERROR: Failed to search arXiv API: {str(exc)}"
-        logger.error(error_msg, exc_info=True)
-        return error_msg
-    except ET.ParseError as exc:
-        error_msg = f"ARXIV_ERROR: Failed to parse arXiv API response: {str(exc)}"
-        logger.error(error_msg, exc_info=True)
-        return error_msg
     except Exception as exc:
-        error_msg = f"ARXIV_ERROR: Unexpected error during arXiv search: {str(exc)}"
-        logger.error(error_msg, exc_info=True)
-        return error_msg
+        return _arxiv_error(exc)
+
+
+arxiv_search = StructuredTool.from_function(
+    func=_arxiv_search, coroutine=_aarxiv_search, name="arxiv_search"
+)
 
 
 def get_tools() -> list:
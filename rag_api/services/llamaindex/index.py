@@ -3,11 +3,13 @@
 from __future__ import annotations
 
 from functools import lru_cache
+from typing import Any
 
 from llama_index.core import Settings as LISettings
 from llama_index.core import VectorStoreIndex
 from llama_index.core.embeddings import BaseEmbedding
 from llama_index.core.llms import LLM
+from pydantic import PrivateAttr
 
 try:
     from llama_index.embeddings.openai import OpenAIEmbedding
@@ -26,13 +28,71 @@ except ImportError:
 
 from llama_index.vector_stores.qdrant import QdrantVectorStore
 
+from rag_api.clients.embedding_cache import EmbeddingCache, get_embedding_cache
+from rag_api.clients.embeddings import get_embedding_namespace
 from rag_api.clients.openai import get_openai_client
 from rag_api.clients.qdrant import get_qdrant_client
 from rag_api.settings import get_settings
 
 
+class CachedLlamaIndexEmbedding(BaseEmbedding):
+    """LlamaIndex embedding wrapper backed by the shared on-disk embedding cache."""
+
+    _inner: BaseEmbedding = PrivateAttr()
+    _cache: EmbeddingCache = PrivateAttr()
+    _namespace: str = PrivateAttr()
+
+    def __init__(self, inner: BaseEmbedding, cache: EmbeddingCache, namespace: str, **kwargs: Any) -> None:
+        super().__init__(
+            model_name=inner.model_name,
+            embed_batch_size=inner.embed_batch_size,
+            **kwargs,
+        )
+        self._inner = inner
+        self._cache = cache
+        self._namespace = namespace
+
+    @classmethod
+    def class_name(cls) -> str:
+        return "CachedLlamaIndexEmbedding"
+
+    def _get_query_embedding(self, query: str) -> list[float]:
+        return self._cache.get_or_compute(
+            f"{self._namespace}:query",
+            [query],
+            lambda texts: [self._inner._get_query_embedding(texts[0])],
+        )[0]
+
+    async def _aget_query_embedding(self, query: str) -> list[float]:
+        async def compute(texts: list[str]) -> list[list[float]]:
+            return [await self._inner._aget_query_embedding(texts[0])]
+
+        return (await self._cache.aget_or_compute(f"{self._namespace}:query", [query], compute))[0]
+
+    def _get_text_embedding(self, text: str) -> list[float]:
+        return self._get_text_embeddings([text])[0]
+
+    def _get_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return self._cache.get_or_compute(
+            f"{self._namespace}:document", texts, self._inner._get_text_embeddings
+        )
+
+    async def _aget_text_embeddings(self, texts: list[str]) -> list[list[float]]:
+        return await self._cache.aget_or_compute(
+            f"{self._namespace}:document", texts, self._inner._aget_text_embeddings
+        )
+
+
 def get_llamaindex_embedding() -> BaseEmbedding:
-    """Get the configured embedding model based on provider settings."""
+    """Get the configured embedding model, wrapped in the embedding cache when enabled."""
+    embedding = _build_llamaindex_embedding()
+    cache = get_embedding_cache()
+    if cache is None:
+        return embedding
+    return CachedLlamaIndexEmbedding(embedding, cache, get_embedding_namespace())
+
+
+def _build_llamaindex_embedding() -> BaseEmbedding:
     settings = get_settings()
 
     if settings.embedding_provider == "openai":
@@ -9,6 +9,7 @@ from typing import Any
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel, Field
 
+from rag_api.clients.qdrant import build_search_filter
 from rag_api.services.llamaindex.index import get_index
 from rag_api.settings import get_settings
 
@@ -21,6 +22,10 @@ class QueryRequest(BaseModel):
     question: str
     debug: bool = Field(default=True, description="Include debug information in response")
     similarity_top_k: int = Field(default=3, ge=1, le=10, description="Number of similar documents to retrieve")
+    categories: list[str] | None = Field(default=None, description="Only search papers in these arXiv categories")
+    published_after: str | None = Field(default=None, description="Only papers submitted on or after this date")
+    published_before: str | None = Field(default=None, description="Only papers submitted on or before this date")
+    arxiv_ids: list[str] | None = Field(default=None, description="Only search these papers")
 
 
 class QueryResponse(BaseModel):
@@ -35,6 +40,14 @@ async def query(request: QueryRequest) -> QueryResponse:
     settings = get_settings()
     start_time = time.time()
 
+    # Filters are pushed down into the Qdrant search itself.
+    try:
+        qdrant_filter = build_search_filter(
+            request.categories, request.published_after, request.published_before, request.arxiv_ids
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=422, detail=str(exc)) from exc
+
     try:
         logger.info(f"Processing query: {request.question[:100]}...")
         
@@ -43,6 +56,7 @@ async def query(request: QueryRequest) -> QueryResponse:
             similarity_top_k=request.similarity_top_k,
             response_mode="compact",
             summary_mode="tree_summarize",
+            vector_store_kwargs={"qdrant_filters": qdrant_filter} if qdrant_filter else {},
         )
         response = query_engine.query(request.question)
         
@@ -55,6 +69,7 @@ async def query(request: QueryRequest) -> QueryResponse:
                 "model_provider": settings.llm_provider,
                 "embedding_provider": settings.embedding_provider,
                 "similarity_top_k": request.similarity_top_k,
+                "filtered": qdrant_filter is not None,
                 "execution_time_ms": round(execution_time, 2),
             }
             
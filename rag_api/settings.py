@@ -16,10 +16,67 @@ class Settings(BaseSettings):
     # ArXiv query settings
     arxiv_query: str = "quantum computing"
     arxiv_max_docs: int = 5
+    arxiv_api_url: str = "https://export.arxiv.org/api/query"  # arXiv API endpoint (point at a mirror or fixture server)
+    arxiv_page_size: int = 100  # Results per arXiv API request when paging (max 2000)
+    arxiv_request_interval: float = 3.0  # Seconds between arXiv API requests (arXiv asks for >= 3)
+    arxiv_rate_limit_burst: int = 1  # Requests allowed back to back before pacing applies
+    arxiv_pdf_request_interval: float = 1.0  # Seconds between arXiv PDF downloads (full-text mode, retries included)
+    arxiv_pdf_rate_limit_burst: int = 1  # PDF downloads allowed back to back before pacing applies
+    rate_limit_state_path: str = ".cache/ratelimit.sqlite3"  # Token buckets shared by all processes on this host
+
+    # Outbound HTTP connection pools (shared by the arXiv, PDF and OpenAI clients)
+    http_max_connections: int = 32  # Open connections per pool
+    http_max_keepalive_connections: int = 16  # Idle connections kept alive for reuse
+    http_keepalive_expiry: float = 60.0  # Seconds an idle connection is kept open
+    http_timeout: float = 60.0  # Default read/write timeout in seconds
+    http_connect_timeout: float = 10.0  # Connect timeout in seconds
+    http2_enabled: bool = True  # Negotiate HTTP/2 when the h2 package is installed
+
+    # Ingestion pipeline settings
+    ingestion_batch_size: int = 64  # Documents per embed_documents call / Qdrant upsert
+    ingestion_queue_batches: int = 4  # Batches buffered between pipeline stages (bounds memory)
+    ingestion_embed_workers: int = 2  # Concurrent embedding requests
+    ingestion_upsert_workers: int = 1  # Concurrent Qdrant upserts
+    chunking_enabled: bool = True  # Split documents into token-bounded chunks before embedding
+    chunk_size_tokens: int = 256  # Target tokens per chunk
+    chunk_overlap_tokens: int = 32  # Tokens of trailing sentences repeated in the next chunk
+    fulltext_download_concurrency: int = 4  # Parallel PDF downloads in full-text mode
+    fulltext_download_timeout: float = 60.0  # Seconds per PDF download
+    fulltext_parse_workers: Optional[int] = None  # PDF text extraction processes (default: CPU count)
+    bulk_fetch_concurrency: int = 4  # Queries fetched in parallel by the bulk CLI (API pacing is shared)
+    incremental_ingestion: bool = False  # Fetch newest-first (not by relevance) and stop at the last run's high-water mark
+    ingestion_state_path: str = ".cache/ingestion_state.sqlite3"  # Per-query ingestion state (high-water marks, run manifests)
+    ingestion_run_lease_seconds: float = 120.0  # A running run without a heartbeat this long is resumable
+    ingestion_checkpoint_docs: int = 500  # Papers per durable checkpoint of an API run (0: checkpoint only at the end)
+    near_dedup_enabled: bool = True  # Drop near-duplicate chunks (MinHash/LSH) before embedding
+    near_dedup_threshold: float = 0.85  # Estimated Jaccard similarity at which a chunk is a duplicate
+    near_dedup_num_perm: int = 128  # MinHash permutations per signature
 
     # Qdrant configuration
     qdrant_url: str = "http://localhost:6334"
+    qdrant_prefer_grpc: bool = False  # Send point and search calls over gRPC (binary vectors, no JSON)
+    qdrant_grpc_port: int = 6335  # Qdrant gRPC port on the qdrant_url host
+    qdrant_timeout: Optional[int] = None  # Request timeout in seconds (unset: client default)
+    qdrant_max_connections: Optional[int] = None  # REST connection pool size (100 if only the keep-alive limit is set)
+    qdrant_max_keepalive_connections: Optional[int] = None  # Idle REST connections kept (20 if only the pool size is set)
+    qdrant_grpc_keepalive_ms: Optional[int] = None  # gRPC keepalive ping interval for long-lived channels
     qdrant_collection: str = "arxiv_papers"
+    qdrant_collection_profile: str = "default"  # Collection tuning preset: default, balanced or large
+    # Per-setting overrides of the profile (unset keeps the profile's value)
+    qdrant_quantization: Optional[Literal["none", "scalar", "binary"]] = None
+    qdrant_quantization_rescore: bool = True  # Re-rank quantized candidates with the original vectors
+    qdrant_quantization_oversampling: Optional[float] = None  # Candidates fetched per result before rescoring
+    qdrant_on_disk_vectors: Optional[bool] = None  # Keep original vectors on disk (mmap)
+    qdrant_on_disk_payload: Optional[bool] = None  # Keep payloads on disk
+    qdrant_hnsw_m: Optional[int] = None  # HNSW graph degree
+    qdrant_hnsw_ef_construct: Optional[int] = None  # HNSW build-time candidate list size
+    qdrant_segment_number: Optional[int] = None  # Target number of segments per shard
+    # Hybrid retrieval: BM25-style sparse vectors fused with dense hits by reciprocal rank
+    hybrid_search_enabled: bool = True  # Store a sparse lexical vector per chunk and search both
+    hybrid_prefetch_limit: int = 20  # Candidates taken from each retriever before fusion
+    bm25_k1: float = 1.2  # Term-frequency saturation
+    bm25_b: float = 0.75  # Length normalisation strength
+    bm25_avg_doc_length: Optional[float] = None  # Average terms per chunk (default: chunk_size_tokens)
 
     # Model providers
     llm_provider: Literal["openai"] = "openai"
@@ -36,6 +93,12 @@ class Settings(BaseSettings):
     # HuggingFace configuration (optional fallback for local embeddings)
     huggingface_model: str = "sentence-transformers/all-MiniLM-L6-v2"
 
+    # Embedding cache (SQLite, keyed by provider/model/text hash)
+    embedding_cache_enabled: bool = True
+    embedding_cache_path: str = ".cache/embeddings.sqlite3"
+    embedding_cache_max_entries: int = 500_000  # Least recently used vectors are evicted beyond this
+    embedding_registry_path: str = ".cache/embedding_models.json"  # Probed model dimensions
+
     # LangChain/LangSmith configuration
     langchain_api_key: Optional[str] = None
     langsmith_api_key: Optional[str] = None
@@ -45,7 +108,19 @@ class Settings(BaseSettings):
 
     # Search configuration
     arxiv_search_max_results: int = 5
-    rag_chunk_max_length: int = 1000  # Max characters per RAG chunk to prevent context overflow
+    rag_chunk_max_length: int = 1500  # Max characters per RAG chunk (fits a chunk_size_tokens chunk)
+    rag_top_n: int = 3  # Chunks rag_query returns to the agent
+    rag_selection: Literal["similarity", "mmr"] = "similarity"  # mmr: trade relevance for diversity
+    mmr_candidates: int = 20  # Candidates fetched (with vectors) for MMR selection
+    mmr_lambda: float = 0.5  # 1.0 ranks by relevance only, 0.0 by diversity only
+    rag_max_chunks_per_paper: Optional[int] = None  # Cap chunks per paper via Qdrant group-by (unset: no cap)
+    # Optional cross-encoder rerank: over-fetch candidates, re-score each (query, chunk) pair on CPU
+    rerank_enabled: bool = False
+    rerank_model: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    rerank_candidates: int = 20  # Candidates fetched from Qdrant before reranking
+    rerank_batch_size: int = 16  # Pairs scored per cross-encoder forward pass
+    rerank_workers: int = 2  # Threads scoring batches concurrently
+    rerank_max_length: int = 512  # Tokens per (query, chunk) pair; longer pairs are truncated
     arxiv_summary_max_length: int = 400  # Max characters per arXiv summary
 
     # Service ports
@@ -57,6 +132,8 @@ class Settings(BaseSettings):
 
     ingestion_host: str = "0.0.0.0"
     ingestion_port: int = 9030
+    ingestion_max_concurrent_jobs: int = 2  # Ingestion jobs allowed to run at once
+    ingestion_progress_interval: float = 1.0  # Seconds between /jobs/{id}/events updates
 
     # APO (Automatic Prompt Optimization) settings
     apo_optimized_prompt_path: Optional[str] = None  # Path to optimized prompt file (default: "optimized_prompt.txt")